@@ -1,22 +1,36 @@
 import os
-import winreg
 import subprocess
 import json
 import threading
 from colorama import Style
 from config import COLOR_ERROR, COLOR_INFO, COLOR_SUCCESS, COLOR_WARNING
 from language import LanguageManager
+from lazy_import import lazy_module
+from tracing import tracer, traced_input
+from tool_watchdog import run_process
+from tool_result import failed
+
+winreg = lazy_module('winreg')
 
 class AppManager:
-    def __init__(self, lang_manager: LanguageManager):
+    def __init__(self, lang_manager: LanguageManager, winget_available=None):
         self.lang = lang_manager
         self.installed_apps = {}
-        self.winget_available = self._check_winget()
+        self._winget_available = winget_available
+        self._winget_lock = threading.Lock()
         print(self.lang.get('appman_scanning'))
         scan_thread = threading.Thread(target=self._scan_apps, daemon=True)
         scan_thread.start()
 
-    def _check_winget(self):
+    @property
+    def winget_available(self):
+        with self._winget_lock:
+            if self._winget_available is None:
+                self._winget_available = self.check_winget()
+            return self._winget_available
+
+    @staticmethod
+    def check_winget():
         try:
             result = subprocess.run(['winget', '--version'], capture_output=True, text=True, shell=True)
             return result.returncode == 0
@@ -67,9 +81,11 @@ class AppManager:
             (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
             (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall")
         ]
-        for root, path in registry_paths:
-            self._scan_registry_key(root, path)
-        self._scan_uwp_apps()
+        with tracer.span('app_scan') as span:
+            for root, path in registry_paths:
+                self._scan_registry_key(root, path)
+            self._scan_uwp_apps()
+            span['apps'] = len(self.installed_apps)
         print(self.lang.get('appman_scan_complete', count=len(self.installed_apps)))
 
     def _execute_launch(self, app_info):
@@ -82,7 +98,7 @@ class AppManager:
         except Exception as e:
             err_msg = self.lang.get('appman_launch_fail', name=app_info['name'], e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def launch_app(self, app_name):
         app_name_lower = app_name.lower().strip()
@@ -100,17 +116,17 @@ class AppManager:
         except Exception as e:
             err_msg = self.lang.get('appman_fallback_fail', name=app_name, e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def winget_search(self, query):
         if not self.winget_available:
             err_msg = self.lang.get('winget_unavailable')
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         
         try:
             command = ['winget', 'search', query, '--source', 'winget', '--accept-source-agreements']
-            result = subprocess.run(command, capture_output=True, text=True, shell=True, encoding='utf-8', errors='replace')
+            result = run_process(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, shell=True, encoding='utf-8', errors='replace')
 
             if result.returncode != 0:
                 raise Exception(result.stderr)
@@ -145,17 +161,17 @@ class AppManager:
         except Exception as e:
             err_msg = self.lang.get('winget_cli_error', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def winget_install(self, package_id):
         if not self.winget_available:
             err_msg = self.lang.get('winget_unavailable')
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
             
-        konfirmasi = input(self.lang.get('winget_install_confirm', package_id=package_id)).lower()
+        konfirmasi = traced_input(self.lang.get('winget_install_confirm', package_id=package_id)).lower()
         if konfirmasi != 'y':
-            return self.lang.get('winget_install_cancelled')
+            return failed(self.lang.get('winget_install_cancelled'))
         
         print(f"{COLOR_INFO}{self.lang.get('winget_installing', package_id=package_id)}")
         try:
@@ -163,11 +179,13 @@ class AppManager:
                 'winget', 'install', '--id', package_id, 
                 '--accept-package-agreements', '--accept-source-agreements'
             ]
-            subprocess.run(command, check=True, shell=True)
+            result = run_process(command, shell=True)
+            if result.returncode != 0:
+                raise subprocess.CalledProcessError(result.returncode, command)
             return self.lang.get('winget_install_success', package_id=package_id)
         except Exception as e:
             err_msg = self.lang.get('winget_install_fail', e=e)
             print(err_msg)
-            return err_msg
+            return failed(err_msg)
 
 
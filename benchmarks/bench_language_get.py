@@ -0,0 +1,49 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language import LanguageManager, COLOR_DEFAULTS
+
+def legacy_get(strings, key, **kwargs):
+    template = strings.get(key, f"<{key}_NOT_FOUND>")
+    try:
+        for name, value in COLOR_DEFAULTS.items():
+            kwargs.setdefault(name, value)
+        return template.format(**kwargs)
+    except KeyError as e:
+        return f"<{key}_FORMAT_ERROR: Missing {e}>"
+
+def render_os_context(get, files):
+    report_lines = [
+        get('os_context_header'),
+        get('os_context_cwd', cwd="C:\\Users\\user\\Downloads"),
+        get('os_context_system', os="Windows 10"),
+        get('os_context_user', user="user"),
+        get('os_context_admin', status=get('status_privileges_admin')),
+        get('os_context_files_header')
+    ]
+    for item in files:
+        report_lines.append(get('os_context_file_item', item=item))
+    return "\n".join(report_lines)
+
+def main(file_count=5000, repeat=5, number=20):
+    lang = LanguageManager(None, 'id')
+    strings = lang.strings
+    files = [f"file_{i:05d}.txt" for i in range(file_count)]
+
+    def legacy(key, **kwargs):
+        return legacy_get(strings, key, **kwargs)
+
+    assert render_os_context(legacy, files) == render_os_context(lang.get, files)
+
+    legacy_best = min(timeit.repeat(lambda: render_os_context(legacy, files), repeat=repeat, number=number)) / number
+    compiled_best = min(timeit.repeat(lambda: render_os_context(lang.get, files), repeat=repeat, number=number)) / number
+    print(f"dapatkan_konteks_os ({file_count} file)")
+    print(f"  legacy get   : {legacy_best * 1000:.2f} ms")
+    print(f"  compiled get : {compiled_best * 1000:.2f} ms")
+    print(f"  speed-up     : {legacy_best / compiled_best:.2f}x")
+
+if __name__ == "__main__":
+    main()
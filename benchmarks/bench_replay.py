@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import builtins
+import contextlib
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RECORDING = os.path.join(REPO_DIR, 'tests', 'fixtures', 'replay_session.jsonl')
+sys.path.insert(0, REPO_DIR)
+
+from language import LanguageManager
+from shell import AI_Shell
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def replay_once(lang, config):
+    shell = AI_Shell(lang, dict(config))
+    commands = getattr(shell.ai_model, 'primary', shell.ai_model).user_messages()
+    timings = []
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        for command in commands:
+            started = time.perf_counter()
+            shell.handle_command(command)
+            timings.append(time.perf_counter() - started)
+    return shell, timings
+
+def replay_config(recording, latency_scale=0.0):
+    return {
+        'last_language': 'id',
+        'model_backend': 'replay',
+        'replay_file': recording,
+        'replay_latency_scale': latency_scale,
+        'local_router': False,
+        'model_rpm': 0,
+    }
+
+def main(recording=SAMPLE_RECORDING, latency_scale=0.0, rounds=3):
+    config = replay_config(recording, latency_scale)
+    lang = LanguageManager(None, 'id')
+    builtins.input = lambda prompt='': 'n'
+
+    all_timings = []
+    for _ in range(rounds):
+        shell, timings = replay_once(lang, config)
+        all_timings.extend(timings)
+
+    scheduler = shell.tool_scheduler.stats
+    print(f"replay {os.path.basename(recording)} ({len(timings)} perintah x {rounds} ronde, latency x{latency_scale})")
+    print(f"  total per ronde : {sum(all_timings) / rounds * 1000:.2f} ms")
+    print(f"  per perintah    : p50 {percentile(all_timings, 0.5) * 1000:.2f} ms | p95 {percentile(all_timings, 0.95) * 1000:.2f} ms")
+    print(f"  tool calls      : {scheduler['calls']} ({scheduler['parallel_calls']} paralel) per ronde")
+    for mode, stats in shell.round_trip_stats.items():
+        if stats['commands']:
+            print(f"  round trip {mode:<6}: {stats['commands']} perintah, rata {stats['round_trips'] / stats['commands']:.1f} RT")
+    replay = getattr(shell.ai_model, 'primary', shell.ai_model)
+    print(f"  replay          : {replay.stats['replayed']} respons, {replay.stats['skipped']} dilewati")
+    if replay is not shell.ai_model:
+        print(f"  model scheduler : {shell.ai_model.stats['requests']} request, {shell.ai_model.stats['retries']} retry, {shell.ai_model.stats['failures']} gagal")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else SAMPLE_RECORDING, float(sys.argv[2]) if len(sys.argv) > 2 else 0.0, int(sys.argv[3]) if len(sys.argv) > 3 else 3)
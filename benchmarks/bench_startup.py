@@ -0,0 +1,36 @@
+import os
+import sys
+import json
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import time, sys, json
+started = time.perf_counter()
+import shell
+elapsed = time.perf_counter() - started
+heavy = ['google.generativeai', 'PIL.ImageGrab', 'psutil', 'win32gui', 'win32clipboard', 'win32file', 'pyperclip']
+print(json.dumps({'seconds': elapsed, 'eager': [name for name in heavy if name in sys.modules]}))
+"""
+
+def cold_import(python=sys.executable):
+    output = subprocess.run([python, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(budget_ms=400.0, runs=5):
+    samples = [cold_import() for _ in range(runs)]
+    median_ms = statistics.median(sample['seconds'] for sample in samples) * 1000
+    eager = samples[-1]['eager']
+    print(f"cold import shell.py ({runs} proses baru)")
+    print(f"  median : {median_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    print(f"  module berat yang ke-load pas import: {', '.join(eager) if eager else '-'}")
+    if median_ms > budget_ms or eager:
+        print("  GAGAL: startup lewat budget atau ada module berat yang ke-import duluan.")
+        return 1
+    print("  OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else 400.0))
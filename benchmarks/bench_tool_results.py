@@ -0,0 +1,45 @@
+import os
+import sys
+import inspect
+import builtins
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import HISTORY_CHARS_PER_TOKEN
+from language import LanguageManager
+from shell import AI_Shell
+from tool_scheduler import is_read_only
+
+def no_required_args(func):
+    return all(param.default is not inspect.Parameter.empty for param in inspect.signature(func).parameters.values())
+
+def tokens(text):
+    return len(text) // HISTORY_CHARS_PER_TOKEN + 1
+
+def main(recording=None):
+    config = {'last_language': 'id', 'tool_cache': False, 'model_scheduler': False}
+    if recording:
+        config.update({'model_backend': 'replay', 'replay_file': recording, 'replay_latency_scale': 0.0})
+    builtins.input = lambda prompt='': 'n'
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        shell = AI_Shell(LanguageManager(None, 'id'), config)
+        shell.app_manager
+        rows = []
+        for func in shell.tools:
+            if not is_read_only(func) or not no_required_args(func):
+                continue
+            try:
+                result = shell.tool_scheduler.invoke(func.__name__, {}, paged=False)
+            except Exception:
+                continue
+            rows.append((func.__name__, tokens(str(result)), tokens(shell.tool_scheduler.text_for_model(func.__name__, result))))
+
+    print(f"hasil alat ke model, sebelum vs sesudah ({len(rows)} alat read-only)")
+    for name, before, after in rows:
+        print(f"  {name:<22} {before:>6} -> {after:>6} token ({(before - after) / before * 100:5.1f}% hemat)")
+    before, after = sum(row[1] for row in rows), sum(row[2] for row in rows)
+    print(f"  {'TOTAL':<22} {before:>6} -> {after:>6} token ({(before - after) / before * 100:5.1f}% hemat)")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
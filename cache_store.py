@@ -0,0 +1,325 @@
+import os
+import json
+import time
+import atexit
+import threading
+from collections import OrderedDict
+from config import CACHE_FLUSH_INTERVAL, CACHE_COMPACT_MIN_RECORDS, CACHE_COMPACT_RATIO, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL_SECONDS, SUPPORTED_LANGUAGES
+from lang_detect import detect_language, normalize_code, CLOSE_LANGUAGES
+
+class CacheStore:
+    def __init__(self, log_path, flush_interval=CACHE_FLUSH_INTERVAL, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL_SECONDS, background=True):
+        self.log_path = log_path
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.bytes_used = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+        self._pending = []
+        self._log_records = 0
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._compacting = False
+        self._closed = False
+        self._wake = threading.Event()
+        self._load()
+        if background:
+            self._flusher = threading.Thread(target=self._flush_loop, name="cache-flusher", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not None
+
+    @staticmethod
+    def _entry_size(key, value):
+        return len(key.encode('utf-8')) + len(value.encode('utf-8'))
+
+    def _is_expired(self, ts, now=None):
+        return bool(self.ttl) and (now or time.time()) - ts > self.ttl
+
+    def get(self, key, default=None, count=True):
+        with self._lock:
+            entry = self.data.get(key)
+            if entry is not None and self._is_expired(entry[1]):
+                self._remove(key)
+                self._pending.append({'k': key, 'd': 1})
+                self.stats['expired'] += 1
+                entry = None
+            if entry is None:
+                if count: self.stats['misses'] += 1
+                return default
+            self.data.move_to_end(key)
+            if count: self.stats['hits'] += 1
+            return entry[0]
+
+    def set(self, key, value):
+        ts = time.time()
+        with self._lock:
+            if key in self.data:
+                self._remove(key)
+            self.data[key] = (value, ts)
+            self.bytes_used += self._entry_size(key, value)
+            self._pending.append({'k': key, 'v': value, 'ts': ts})
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            if key in self.data:
+                self._remove(key)
+                self._pending.append({'k': key, 'd': 1})
+
+    def _remove(self, key):
+        value, _ = self.data.pop(key)
+        self.bytes_used -= self._entry_size(key, value)
+
+    def _evict(self):
+        while self.data and ((self.max_entries and len(self.data) > self.max_entries) or (self.max_bytes and self.bytes_used > self.max_bytes)):
+            key = next(iter(self.data))
+            self._remove(key)
+            self._pending.append({'k': key, 'd': 1})
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._io_lock, self._lock:
+            self.data = OrderedDict()
+            self.bytes_used = 0
+            self._pending = []
+            self._log_records = 0
+            if os.path.exists(self.log_path):
+                open(self.log_path, 'w', encoding='utf-8').close()
+
+    def _load(self):
+        if not os.path.exists(self.log_path):
+            return
+        now = time.time()
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._apply(record, now)
+                self._log_records += 1
+        self._evict()
+        self._pending = []
+
+    def _apply(self, record, now):
+        key = record['k']
+        if key in self.data:
+            self._remove(key)
+        if 'd' in record:
+            return
+        ts = record.get('ts', now)
+        if self._is_expired(ts, now):
+            return
+        self.data[key] = (record['v'], ts)
+        self.bytes_used += self._entry_size(key, record['v'])
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.maintain()
+
+    def maintain(self):
+        self.flush()
+        if self._needs_compaction():
+            self.compact()
+
+    def flush(self):
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+            lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in pending)
+            os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            self._log_records += len(pending)
+            return len(pending)
+
+    def _needs_compaction(self):
+        return self._log_records > max(CACHE_COMPACT_MIN_RECORDS, len(self.data) * CACHE_COMPACT_RATIO)
+
+    def compact(self):
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        try:
+            with self._io_lock:
+                with self._lock:
+                    snapshot = list(self.data.items())
+                tmp_path = self.log_path + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    for key, (value, ts) in snapshot:
+                        f.write(json.dumps({'k': key, 'v': value, 'ts': ts}, ensure_ascii=False) + "\n")
+                os.replace(tmp_path, self.log_path)
+                self._log_records = len(snapshot)
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def import_json(self, json_path):
+        if not os.path.exists(json_path):
+            return 0
+        with open(json_path, 'r', encoding='utf-8') as f:
+            try: entries = json.load(f)
+            except json.JSONDecodeError: return 0
+        for key, value in entries.items():
+            self.set(key, value)
+        self._wake.set()
+        return len(entries)
+
+    def export_json(self, json_path):
+        with self._lock:
+            snapshot = {key: value for key, (value, _) in self.data.items()}
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=4, ensure_ascii=False)
+        return len(snapshot)
+
+    def size_on_disk(self):
+        try: return os.path.getsize(self.log_path)
+        except OSError: return 0
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self.flush()
+        atexit.unregister(self.close)
+
+class TranslationCache:
+    def __init__(self, cache_dir, active_lang, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL_SECONDS, flush_interval=CACHE_FLUSH_INTERVAL):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.active_lang = active_lang
+        self.shards = {}
+        self._closed_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._wake = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="cache-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _stores(self):
+        with self._lock:
+            return list(self.shards.values())
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            for store in self._stores():
+                store.maintain()
+
+    def shard(self, lang_code=None):
+        lang_code = lang_code or self.active_lang
+        with self._lock:
+            store = self.shards.get(lang_code)
+            if store is None:
+                store = CacheStore(os.path.join(self.cache_dir, f"{lang_code}.log"), self.flush_interval, self.max_entries, self.max_bytes, self.ttl, background=False)
+                self.shards[lang_code] = store
+            return store
+
+    def set_active(self, lang_code):
+        with self._lock:
+            self.active_lang = lang_code
+            inactive = [code for code in self.shards if code != lang_code]
+            for code in inactive:
+                store = self.shards.pop(code)
+                store.close()
+                for name, value in store.stats.items():
+                    self._closed_stats[name] += value
+
+    def __len__(self):
+        return len(self.shard())
+
+    def __contains__(self, key):
+        return key in self.shard()
+
+    def get(self, key, default=None):
+        return self.shard().get(key, default)
+
+    def set(self, key, value):
+        self.shard().set(key, value)
+
+    def flush(self):
+        for store in list(self.shards.values()):
+            store.flush()
+
+    def clear(self):
+        for store in list(self.shards.values()):
+            store.clear()
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.log'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self):
+        totals = dict(self._closed_stats)
+        for store in list(self.shards.values()):
+            for name, value in store.stats.items():
+                totals[name] += value
+        return totals
+
+    def bytes_used(self):
+        return sum(store.bytes_used for store in list(self.shards.values()))
+
+    def size_on_disk(self):
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        return sum(os.path.getsize(os.path.join(self.cache_dir, name)) for name in os.listdir(self.cache_dir) if name.endswith('.log'))
+
+    def export_json(self, json_path):
+        return self.shard().export_json(json_path)
+
+    @staticmethod
+    def _language_of(value):
+        detected, _ = detect_language(value)
+        detected = normalize_code(detected) if detected else None
+        return detected if detected in SUPPORTED_LANGUAGES else None
+
+    def import_json(self, json_path):
+        if not os.path.exists(json_path):
+            return 0
+        with open(json_path, 'r', encoding='utf-8') as f:
+            try: entries = json.load(f)
+            except json.JSONDecodeError: return 0
+        groups = {}
+        for key, value in entries.items():
+            groups.setdefault(self._language_of(value), {})[key] = value
+        undetected = groups.pop(None, {})
+        for lang_code in sorted(groups, key=lambda code: len(groups[code])):
+            partner = CLOSE_LANGUAGES.get(lang_code)
+            if partner in groups and len(groups[partner]) >= len(groups[lang_code]):
+                groups[partner].update(groups.pop(lang_code))
+        dominant = max(groups, key=lambda code: len(groups[code]), default=self.active_lang)
+        groups.setdefault(dominant, {}).update(undetected)
+        for lang_code, group in groups.items():
+            store = self.shard(lang_code)
+            for key, value in group.items():
+                store.set(key, value)
+        self._wake.set()
+        return len(entries)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        for store in self._stores():
+            store.close()
+        atexit.unregister(self.close)
@@ -0,0 +1,142 @@
+import os
+import re
+import sys
+import threading
+from config import SUPPORTED_LANGUAGES, ROUTER_MIN_APP_PREFIX
+from tool_result import ToolResult
+from tool_watchdog import current_token
+
+CHAIN_WORDS = re.compile(r"\b(dan|terus|trus|lalu|kemudian|abis itu|habis itu|and|then|after)\b|[;&|]", re.IGNORECASE)
+URL_PATTERN = re.compile(r"^(https?://\S+|www\.\S+|[\w-]+(\.[\w-]+)*\.(com|id|net|org|io|dev|co|ai|app|edu|gov)(/\S*)?)$", re.IGNORECASE)
+
+EXACT_COMMANDS = {
+    'status': ['status', 'cek status', 'check status', 'status script'],
+    'perf': ['perf', 'performa', 'cek performa', 'latency', 'latensi'],
+    'help': ['help', 'bantuan', 'tolong', 'menu', 'daftar perintah', 'list commands', '?'],
+    'mute': ['mute', 'diam', 'bisukan', 'senyap', 'mute nvda'],
+    'unmute': ['unmute', 'bunyikan', 'nyalain suara', 'unmute nvda'],
+    'pause': ['pause', 'jeda', 'stop monitor', 'matiin auto translate', 'pause translate'],
+    'resume': ['resume', 'nyalain auto translate', 'resume translate', 'lanjutin monitor'],
+    'exit': ['exit', 'quit', 'keluar', 'udahan'],
+    'clear_cache': ['clear cache', 'hapus cache', 'bersihkan cache', 'bersihin cache'],
+    'direktori_sekarang': ['pwd', 'cwd', 'direktori sekarang', 'folder sekarang', 'lagi di mana', 'lagi dimana', 'where am i'],
+    'daftar_file': ['ls', 'dir', 'daftar file', 'list file', 'list files', 'lihat file', 'isi folder'],
+    'info_sistem': ['info sistem', 'system info', 'sysinfo'],
+    'info_sistem_lengkap': ['info sistem lengkap', 'full system info'],
+    'info_powerplan': ['info powerplan', 'power plan', 'powerplan'],
+    'daftar_aplikasi': ['daftar aplikasi', 'list apps', 'list aplikasi'],
+    'daftar_proses': ['daftar proses', 'list proses', 'list processes', 'ps', 'tasklist'],
+    'batal_shutdown': ['batal shutdown', 'batalin shutdown', 'cancel shutdown', 'shutdown /a'],
+    'kunci_windows': ['kunci windows', 'kunci layar', 'lock windows', 'lock screen'],
+}
+
+def _is_dir(arg):
+    return os.path.isdir(os.path.expanduser(arg))
+
+def _is_file(arg):
+    return os.path.isfile(os.path.expanduser(arg))
+
+PATTERN_COMMANDS = [
+    (re.compile(r"^(?:cd|chdir|pindah ke|masuk ke|ganti direktori(?: ke)?|change directory to)\s+(?P<arg>.+)$", re.IGNORECASE), 'ganti_direktori', 'tujuan', _is_dir),
+    (re.compile(r"^(?:ls|dir|daftar file(?: di)?|list files?(?: in)?|lihat isi)\s+(?P<arg>.+)$", re.IGNORECASE), 'daftar_file', 'direktori', _is_dir),
+    (re.compile(r"^(?:cat|type|baca file|baca|read file|read)\s+(?P<arg>.+)$", re.IGNORECASE), 'baca_file', 'file_path', _is_file),
+    (re.compile(r"^(?:ganti bahasa(?: ke)?|change language to|bahasa)\s+(?P<arg>[a-z]{2,3}(?:-[a-z]{2})?)$", re.IGNORECASE), 'change_language', 'language_code', lambda arg: arg.lower() in SUPPORTED_LANGUAGES),
+]
+
+OPEN_PATTERN = re.compile(r"^(?:buka|bukain|open|launch|jalanin app)\s+(?P<arg>.+)$", re.IGNORECASE)
+
+class _Tee:
+    def __init__(self, stream, tool_name):
+        self.stream = stream
+        self.tool_name = tool_name
+        self.written = False
+
+    def write(self, data):
+        token = current_token()
+        if data and token is not None and token.tool_name == self.tool_name:
+            self.written = True
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+class CommandRouter:
+    def __init__(self, shell_instance):
+        self.shell = shell_instance
+        self.exact = {phrase: tool_name for tool_name, phrases in EXACT_COMMANDS.items() for phrase in phrases}
+        self.stats = {'inputs': 0, 'hits': 0, 'fallthrough': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(text):
+        return " ".join(text.strip().rstrip('.!').split()).lower()
+
+    @staticmethod
+    def _strip_quotes(arg):
+        arg = arg.strip()
+        if len(arg) >= 2 and arg[0] == arg[-1] and arg[0] in "\"'":
+            return arg[1:-1]
+        return arg
+
+    def _match_open(self, text):
+        match = OPEN_PATTERN.match(text)
+        if not match:
+            return None
+        target = self._strip_quotes(match.group('arg'))
+        if URL_PATTERN.match(target):
+            return 'buka_website', {'url': target}
+        name = target.lower()
+        apps = self.shell.app_manager.installed_apps
+        if name in apps:
+            return 'buka_app', {'app_name': target}
+        if len(name) < ROUTER_MIN_APP_PREFIX:
+            return None
+        matches = [key for key in list(apps) if key.startswith(name)]
+        if len(matches) == 1:
+            return 'buka_app', {'app_name': matches[0]}
+        return None
+
+    def match(self, command_input):
+        text = " ".join(command_input.strip().split())
+        normalized = self._normalize(text)
+        if not normalized or CHAIN_WORDS.search(normalized):
+            return None
+        tool_name = self.exact.get(normalized)
+        if tool_name:
+            return tool_name, {}
+        for pattern, tool_name, arg_name, accepts in PATTERN_COMMANDS:
+            match = pattern.match(text)
+            if match:
+                arg = self._strip_quotes(match.group('arg'))
+                return (tool_name, {arg_name: arg}) if accepts(arg) else None
+        return self._match_open(text)
+
+    def route(self, command_input):
+        with self._lock:
+            self.stats['inputs'] += 1
+        routed = self.match(command_input)
+        if routed is None or getattr(self.shell, routed[0], None) is None:
+            with self._lock:
+                self.stats['fallthrough'] += 1
+            return None
+        with self._lock:
+            self.stats['hits'] += 1
+        tool_name, tool_args = routed
+        scheduler = self.shell.tool_scheduler
+        notices = scheduler.stats['cancel_notices']
+        tee = _Tee(sys.stdout, tool_name)
+        sys.stdout = tee
+        try:
+            result = scheduler.invoke(tool_name, tool_args, paged=False)
+        finally:
+            sys.stdout = tee.stream
+        announced = tee.written or scheduler.stats['cancel_notices'] != notices
+        if isinstance(result, (str, ToolResult)) and str(result) and not announced:
+            print(result)
+        return tool_name, tool_args, result
+
+    def hit_rate(self):
+        return self.stats['hits'] / self.stats['inputs'] * 100 if self.stats['inputs'] else 0.0
@@ -5,9 +5,84 @@ from colorama import Fore, Style
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 GOOGLE_AI_API_KEY = "inputAPIDisini"
 CACHE_FILENAME = os.path.join(SCRIPT_DIR, "translation_cache.json")
+CACHE_DIR = os.path.join(SCRIPT_DIR, "translation_cache")
 STATE_FILENAME = os.path.join(SCRIPT_DIR, "session_state.json")
 CONFIG_FILENAME = os.path.join(SCRIPT_DIR, "config.json")
+TRACE_FILENAME = os.path.join(SCRIPT_DIR, "traces", "spans.jsonl")
 SCRIPT_VERSION = "1.8"
+GEMINI_MODEL_NAME = "gemini-1.5-flash-latest"
+
+MODEL_RPM = 15
+MODEL_BURST = 5
+MODEL_MAX_RETRIES = 3
+MODEL_BACKOFF_BASE = 1.0
+MODEL_BACKOFF_MAX = 16
+MODEL_CALL_DEADLINE = 90
+MODEL_HEDGE_AFTER = 6
+TOOL_SELECT_MAX_CATEGORIES = 3
+
+CACHE_FLUSH_INTERVAL = 2.0
+CACHE_COMPACT_MIN_RECORDS = 1000
+CACHE_COMPACT_RATIO = 2
+CACHE_MAX_ENTRIES = 20000
+CACHE_MAX_BYTES = 8 * 1024 * 1024
+CACHE_TTL_SECONDS = 0
+
+TRANSLATE_API_URL = "https://translate.googleapis.com/translate_a/single"
+TRANSLATE_BATCH_CHARS = 1800
+TRANSLATE_MAX_WORKERS = 3
+
+HTTP_POOL_SIZE = 4
+HTTP_TIMEOUT = 10
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_BASE = 0.5
+HTTP_BACKOFF_MAX = 8
+
+CLIPBOARD_QUEUE_SIZE = 8
+CLIPBOARD_DEBOUNCE_SECONDS = 0.4
+
+LANG_DETECT_MIN_CHARS = 12
+LANG_DETECT_MIN_SCORE = 0.18
+LANG_DETECT_MIN_MARGIN = 0.2
+
+LANG_CHUNK_TOKENS = 1500
+LANG_TRANSLATE_WORKERS = 3
+
+ROUTER_MIN_APP_PREFIX = 3
+
+TOOL_MAX_WORKERS = 4
+RESULT_PAGE_CHARS = 6000
+RESULT_PAGER_MAX_RESULTS = 16
+TOOL_CACHE_MAX_AGE = 300
+TOOL_CACHE_MAX_ENTRIES = 64
+TOOL_TRACE_SIZE = 50
+TOOL_DEFAULT_TIMEOUT = 120
+TOOL_TIMEOUTS = {
+    'jalankan_perintah': 600,
+    'unduh_file': 300,
+    'install_aplikasi': 1800,
+    'run_dism': 3600,
+    'cari_aplikasi': 60,
+    'info_sistem_lengkap': 30,
+    'cari_program_hang': 60,
+    'jalankan_rencana': 0,
+}
+TOOL_WATCHDOG_INTERVAL = 0.2
+TOOL_WAIT_GRACE = 2
+TOOL_MAX_ABANDONED = 4
+DOWNLOAD_SOCKET_TIMEOUT = 30
+
+TRACE_MAX_BYTES = 2 * 1024 * 1024
+TRACE_BACKUPS = 3
+TRACE_FLUSH_RECORDS = 50
+TRACE_SAMPLES_PER_SPAN = 2000
+
+HISTORY_TOKEN_BUDGET = 24000
+HISTORY_CHARS_PER_TOKEN = 4
+HISTORY_KEEP_TURNS = 4
+HISTORY_TOOL_RESULT_CHARS = 400
+HISTORY_TEXT_CHARS = 1500
+HISTORY_SUMMARY_LINES = 40
 
 colorama.init(autoreset=True)
 
@@ -0,0 +1,185 @@
+import json
+from lazy_import import lazy_module
+from config import HISTORY_TOKEN_BUDGET, HISTORY_CHARS_PER_TOKEN, HISTORY_KEEP_TURNS, HISTORY_TOOL_RESULT_CHARS, HISTORY_TEXT_CHARS, HISTORY_SUMMARY_LINES
+
+glm = lazy_module('google.generativeai.protos')
+
+SUMMARY_HEADER = "Ringkasan percakapan lama (dipadatkan otomatis, detail output alat udah dibuang):"
+SUMMARY_ACK = "Oke, gue inget ringkasannya."
+NOTIFICATION_PREFIX = "System Notification:"
+LANGUAGE_NOTICE_PREFIXES = ("System Notification: User has switched the interface language to", "System Notification: The session is starting.")
+
+def _response_text(part):
+    try:
+        response = dict(part.function_response.response)
+        return str(response.get('result', response))
+    except Exception:
+        return str(part.function_response.response)
+
+def _args_text(part):
+    try:
+        return json.dumps(dict(part.function_call.args), ensure_ascii=False, default=str)
+    except Exception:
+        return str(part.function_call.args)
+
+def _is_language_notice(part):
+    return bool(part.text) and part.text.startswith(LANGUAGE_NOTICE_PREFIXES)
+
+def _is_notification(part):
+    return bool(part.text) and part.text.startswith(NOTIFICATION_PREFIX)
+
+def _is_summary(content):
+    return content.role == 'user' and bool(content.parts) and (content.parts[0].text or "").startswith(SUMMARY_HEADER)
+
+def _is_notice_only(content):
+    return content.role == 'user' and bool(content.parts) and all(_is_language_notice(part) for part in content.parts)
+
+def _clip(text, limit):
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [dipangkas {len(text) - limit} karakter]"
+
+class HistoryManager:
+    def __init__(self, budget=HISTORY_TOKEN_BUDGET, keep_turns=HISTORY_KEEP_TURNS, tool_result_chars=HISTORY_TOOL_RESULT_CHARS, text_chars=HISTORY_TEXT_CHARS, summary_lines=HISTORY_SUMMARY_LINES):
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.tool_result_chars = tool_result_chars
+        self.text_chars = text_chars
+        self.summary_lines = summary_lines
+        self.stats = {'compactions': 0, 'tokens': 0, 'tokens_saved': 0, 'turns_summarized': 0}
+
+    @staticmethod
+    def part_chars(part):
+        if part.function_call:
+            return len(part.function_call.name) + len(_args_text(part))
+        if part.function_response:
+            return len(part.function_response.name) + len(_response_text(part))
+        return len(part.text or "")
+
+    def estimate_tokens(self, history):
+        chars = sum(self.part_chars(part) for content in history for part in content.parts)
+        return chars // HISTORY_CHARS_PER_TOKEN + 1 if chars else 0
+
+    @staticmethod
+    def _is_user_turn(content):
+        return content.role == 'user' and any(part.text and not part.function_response for part in content.parts)
+
+    def _turn_starts(self, history):
+        return [index for index in range(len(history)) if self._is_user_turn(history[index])]
+
+    def _shrink_part(self, part):
+        if part.function_response:
+            text = _response_text(part)
+            if len(text) <= self.tool_result_chars:
+                return part
+            return glm.Part(function_response=glm.FunctionResponse(name=part.function_response.name, response={'result': _clip(text, self.tool_result_chars)}))
+        if part.function_call or not part.text or len(part.text) <= self.text_chars:
+            return part
+        return glm.Part(text=_clip(part.text, self.text_chars))
+
+    def _shrink(self, content):
+        return glm.Content(role=content.role, parts=[self._shrink_part(part) for part in content.parts])
+
+    def _summary_line(self, turn):
+        request, tools, answer = "", [], ""
+        for content in turn:
+            for part in content.parts:
+                if part.function_call:
+                    tools.append(part.function_call.name)
+                elif _is_notification(part):
+                    continue
+                elif part.text and not part.function_response:
+                    if content.role == 'user' and not request:
+                        request = part.text
+                    elif content.role == 'model':
+                        answer = part.text
+        line = f"- user: {_clip(' '.join(request.split()), 160)}"
+        if tools:
+            line += f" | alat: {', '.join(dict.fromkeys(tools))}"
+        if answer:
+            line += f" | jawaban: {_clip(' '.join(answer.split()), 160)}"
+        return line
+
+    @staticmethod
+    def _latest_notice(history):
+        latest = None, None
+        for index, content in enumerate(history):
+            for part in content.parts:
+                if content.role == 'user' and _is_language_notice(part):
+                    latest = index, part.text
+        return latest
+
+    @staticmethod
+    def _system_prompt_end(history):
+        if len(history) >= 2 and history[0].role == 'user' and history[1].role == 'model' and not _is_summary(history[0]) and not any(_is_notification(part) for part in history[0].parts):
+            return 2
+        return 0
+
+    def _split(self, history, latest_index):
+        end = self._system_prompt_end(history)
+        notice, summary_lines, body = [], [], []
+        index = end
+        while index < len(history):
+            content = history[index]
+            pair = history[index:index + 2] if index + 1 < len(history) and history[index + 1].role == 'model' else history[index:index + 1]
+            if _is_summary(content):
+                summary_lines = content.parts[0].text[len(SUMMARY_HEADER):].strip().splitlines()
+            elif _is_notice_only(content):
+                if index == latest_index:
+                    notice = pair
+            else:
+                body.append(content)
+                index += 1
+                continue
+            index += len(pair)
+        return history[:end] + notice, summary_lines, body
+
+    def _summary_contents(self, lines, language_notice=None):
+        lines = lines[-self.summary_lines:]
+        parts = [glm.Part(text=SUMMARY_HEADER + "\n" + "\n".join(lines))]
+        if language_notice:
+            parts.append(glm.Part(text=language_notice))
+        return [
+            glm.Content(role='user', parts=parts),
+            glm.Content(role='model', parts=[glm.Part(text=SUMMARY_ACK)]),
+        ]
+
+    def compact(self, history):
+        history = list(history)
+        before = self.estimate_tokens(history)
+        self.stats['tokens'] = before
+        if before <= self.budget:
+            return None
+
+        latest_index, latest_notice = self._latest_notice(history)
+        latest = history[latest_index] if latest_index is not None else None
+        head, summary_lines, body = self._split(history, latest_index)
+        starts = self._turn_starts(body)
+        keep_from = starts[-self.keep_turns] if len(starts) >= self.keep_turns else (starts[0] if starts else len(body))
+        old = [self._shrink(content) for content in body[:keep_from]]
+        recent = body[keep_from:]
+
+        old_starts = [index for index in starts if index < keep_from]
+        bounds = list(zip(old_starts, old_starts[1:] + [len(old)]))
+        turns = [old[start:end] for start, end in bounds]
+        originals = [body[start:end] for start, end in bounds]
+        preamble = old[:old_starts[0]] if old_starts else old
+        language_notice = latest_notice if latest is not None and _is_summary(latest) else None
+        summary = self._summary_contents(summary_lines, language_notice) if summary_lines else []
+        candidate = head + summary + preamble + [content for turn in turns for content in turn] + recent
+
+        while turns and self.estimate_tokens(candidate) > self.budget:
+            turn = turns.pop(0)
+            if any(content is latest for content in originals.pop(0)):
+                language_notice = latest_notice
+            summary_lines.append(self._summary_line(turn))
+            self.stats['turns_summarized'] += 1
+            candidate = head + self._summary_contents(summary_lines, language_notice) + preamble + [content for turn in turns for content in turn] + recent
+
+        after = self.estimate_tokens(candidate)
+        self.stats['tokens'] = after
+        if after >= before:
+            return None
+        self.stats['compactions'] += 1
+        self.stats['tokens_saved'] += max(0, before - after)
+        return candidate
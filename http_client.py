@@ -0,0 +1,158 @@
+import json
+import time
+import queue
+import random
+import threading
+import http.client
+import urllib.parse
+from config import HTTP_POOL_SIZE, HTTP_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class HttpError(Exception):
+    def __init__(self, status, body=b""):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.body = body
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class HttpClient:
+    def __init__(self, base_url, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT, max_retries=HTTP_MAX_RETRIES, backoff_base=HTTP_BACKOFF_BASE, backoff_max=HTTP_BACKOFF_MAX, headers=None):
+        parts = urllib.parse.urlsplit(base_url)
+        self.scheme = parts.scheme or 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.headers = headers or {}
+        self.stats = {'requests': 0, 'connections': 0, 'reused': 0, 'coalesced': 0, 'retries': 0, 'errors': 0}
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _new_connection(self, timeout):
+        conn_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        with self._lock: self.stats['connections'] += 1
+        return conn_class(self.host, self.port, timeout=timeout)
+
+    def _acquire(self, timeout):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            return self._new_connection(timeout), False
+        conn.timeout = timeout
+        if conn.sock:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _send_once(self, method, path, body, headers, timeout):
+        conn, reused = self._acquire(timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if not reused:
+                raise
+            conn, reused = self._new_connection(timeout), False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                raise
+        with self._lock:
+            self.stats['requests'] += 1
+            if reused: self.stats['reused'] += 1
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        return response.status, response.getheader('Retry-After'), data
+
+    def _backoff_delay(self, attempt, retry_after):
+        if retry_after:
+            try: return min(float(retry_after), self.backoff_max)
+            except ValueError: pass
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        return delay * random.uniform(0.5, 1.5)
+
+    def _request(self, method, path, body, headers, timeout):
+        merged_headers = dict(self.headers)
+        merged_headers.update(headers or {})
+        deadline = time.monotonic() + timeout * (self.max_retries + 1)
+        attempt = 0
+        while True:
+            remaining = max(0.1, min(timeout, deadline - time.monotonic()))
+            try:
+                status, retry_after, data = self._send_once(method, path, body, merged_headers, remaining)
+                if status not in RETRY_STATUSES:
+                    if status >= 400:
+                        raise HttpError(status, data)
+                    return status, data
+                error = HttpError(status, data)
+            except (http.client.HTTPException, OSError) as e:
+                retry_after = None
+                error = e
+            if attempt >= self.max_retries or time.monotonic() >= deadline:
+                with self._lock: self.stats['errors'] += 1
+                raise error
+            time.sleep(self._backoff_delay(attempt, retry_after))
+            attempt += 1
+            with self._lock: self.stats['retries'] += 1
+
+    def request(self, method, path, params=None, body=None, headers=None, timeout=None):
+        if params:
+            path = f"{path}?{urllib.parse.urlencode(params)}"
+        timeout = timeout or self.timeout
+        if method != 'GET' or body is not None:
+            return self._request(method, path, body, headers, timeout)
+
+        key = (path, tuple(sorted((headers or {}).items())))
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._inflight[key] = call
+            else:
+                self.stats['coalesced'] += 1
+        if not leader:
+            call.event.wait()
+            if call.error:
+                raise call.error
+            return call.result
+        try:
+            call.result = self._request(method, path, body, headers, timeout)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.event.set()
+
+    def get_json(self, path, params=None, headers=None, timeout=None):
+        _, data = self.request('GET', path, params=params, headers=headers, timeout=timeout)
+        return json.loads(data)
+
+    def close(self):
+        while True:
+            try: self._pool.get_nowait().close()
+            except queue.Empty: break
@@ -0,0 +1,207 @@
+import re
+import math
+import threading
+from collections import Counter
+from config import LANG_DETECT_MIN_CHARS, LANG_DETECT_MIN_SCORE, LANG_DETECT_MIN_MARGIN
+
+SCRIPT_RANGES = [
+    ('ja', [(0x3040, 0x30FF)]),
+    ('zh', [(0x4E00, 0x9FFF), (0x3400, 0x4DBF)]),
+    ('ko', [(0xAC00, 0xD7AF), (0x1100, 0x11FF)]),
+    ('th', [(0x0E00, 0x0E7F)]),
+    ('iw', [(0x0590, 0x05FF)]),
+    ('el', [(0x0370, 0x03FF)]),
+    ('hy', [(0x0530, 0x058F)]),
+    ('ka', [(0x10A0, 0x10FF)]),
+    ('bn', [(0x0980, 0x09FF)]),
+    ('pa', [(0x0A00, 0x0A7F)]),
+    ('gu', [(0x0A80, 0x0AFF)]),
+    ('ta', [(0x0B80, 0x0BFF)]),
+    ('te', [(0x0C00, 0x0C7F)]),
+    ('kn', [(0x0C80, 0x0CFF)]),
+    ('ml', [(0x0D00, 0x0D7F)]),
+    ('si', [(0x0D80, 0x0DFF)]),
+    ('lo', [(0x0E80, 0x0EFF)]),
+    ('my', [(0x1000, 0x109F)]),
+    ('km', [(0x1780, 0x17FF)]),
+]
+
+LANGUAGE_ALIASES = {'he': 'iw'}
+
+CLOSE_LANGUAGES = {'id': 'ms', 'ms': 'id', 'da': 'no', 'no': 'da'}
+
+SIMPLIFIED_MARKERS = set("这们个来时说会为对发经过现还没样点门问间动书长开关见电话东车学业应头让从认进实两给边听")
+TRADITIONAL_MARKERS = set("這們個來時說會為對發經過現還沒樣點門問間動書長開關見電話東車學業應頭讓從認進實兩給邊聽")
+
+SEED_TEXTS = {
+    'id': "Saya tidak tahu apakah dia akan datang ke rumah kami besok pagi. Kami sudah menunggu di sini selama dua jam dan belum ada kabar. "
+          "Tolong kirimkan dokumen itu kepada saya sebelum rapat dimulai. Pemerintah mengumumkan kebijakan baru untuk masyarakat yang tinggal di daerah tersebut. "
+          "Bagaimana cara menggunakan aplikasi ini dengan benar? Ini adalah informasi yang sangat penting untuk kita semua. "
+          "Mereka sedang bekerja di kantor dan akan pulang nanti malam. Terima kasih atas bantuan dan perhatiannya, semoga harimu menyenangkan.",
+    'en': "I do not know whether he will come to our house tomorrow morning. We have been waiting here for two hours and there is no news yet. "
+          "Please send that document to me before the meeting starts. The government announced a new policy for the people who live in that area. "
+          "How do you use this application the right way? This is very important information for all of us. "
+          "They are working in the office and will go home later tonight. Thank you for your help and attention, have a nice day.",
+    'es': "No sé si él vendrá a nuestra casa mañana por la mañana. Hemos estado esperando aquí durante dos horas y todavía no hay noticias. "
+          "Por favor, envíame ese documento antes de que empiece la reunión. El gobierno anunció una nueva política para las personas que viven en esa zona. "
+          "¿Cómo se usa esta aplicación de la manera correcta? Esta es una información muy importante para todos nosotros. "
+          "Ellos están trabajando en la oficina y volverán a casa esta noche. Gracias por tu ayuda y atención, que tengas un buen día.",
+    'fr': "Je ne sais pas s'il viendra chez nous demain matin. Nous attendons ici depuis deux heures et il n'y a toujours pas de nouvelles. "
+          "Merci de m'envoyer ce document avant le début de la réunion. Le gouvernement a annoncé une nouvelle politique pour les personnes qui vivent dans cette région. "
+          "Comment utiliser cette application correctement ? C'est une information très importante pour nous tous. "
+          "Ils travaillent au bureau et rentreront à la maison ce soir. Merci pour votre aide et votre attention, bonne journée.",
+    'de': "Ich weiß nicht, ob er morgen früh zu uns nach Hause kommt. Wir warten hier schon seit zwei Stunden und es gibt noch keine Nachricht. "
+          "Bitte schick mir das Dokument, bevor die Besprechung beginnt. Die Regierung hat eine neue Regelung für die Menschen angekündigt, die in dieser Gegend wohnen. "
+          "Wie benutzt man diese Anwendung richtig? Das ist eine sehr wichtige Information für uns alle. "
+          "Sie arbeiten im Büro und werden heute Abend nach Hause gehen. Vielen Dank für deine Hilfe und Aufmerksamkeit, einen schönen Tag noch.",
+    'pt': "Não sei se ele virá à nossa casa amanhã de manhã. Estamos esperando aqui há duas horas e ainda não há notícias. "
+          "Por favor, envie esse documento para mim antes de a reunião começar. O governo anunciou uma nova política para as pessoas que moram naquela região. "
+          "Como se usa este aplicativo da maneira certa? Esta é uma informação muito importante para todos nós. "
+          "Eles estão trabalhando no escritório e vão voltar para casa hoje à noite. Obrigado pela sua ajuda e atenção, tenha um bom dia.",
+    'it': "Non so se verrà a casa nostra domani mattina. Stiamo aspettando qui da due ore e non ci sono ancora notizie. "
+          "Per favore mandami quel documento prima che inizi la riunione. Il governo ha annunciato una nuova politica per le persone che vivono in quella zona. "
+          "Come si usa questa applicazione nel modo giusto? Questa è un'informazione molto importante per tutti noi. "
+          "Stanno lavorando in ufficio e torneranno a casa stasera. Grazie per il tuo aiuto e la tua attenzione, buona giornata.",
+    'nl': "Ik weet niet of hij morgenochtend naar ons huis komt. We wachten hier al twee uur en er is nog geen nieuws. "
+          "Stuur me dat document alsjeblieft voordat de vergadering begint. De regering heeft een nieuw beleid aangekondigd voor de mensen die in dat gebied wonen. "
+          "Hoe gebruik je deze applicatie op de juiste manier? Dit is zeer belangrijke informatie voor ons allemaal. "
+          "Ze werken op kantoor en gaan vanavond naar huis. Bedankt voor je hulp en aandacht, nog een fijne dag.",
+    'tr': "Yarın sabah bizim eve gelip gelmeyeceğini bilmiyorum. İki saattir burada bekliyoruz ve hâlâ bir haber yok. "
+          "Lütfen toplantı başlamadan önce o belgeyi bana gönder. Hükümet, o bölgede yaşayan insanlar için yeni bir politika açıkladı. "
+          "Bu uygulama doğru şekilde nasıl kullanılır? Bu hepimiz için çok önemli bir bilgi. "
+          "Onlar ofiste çalışıyorlar ve bu akşam eve dönecekler. Yardımın ve ilgin için teşekkür ederim, iyi günler.",
+    'vi': "Tôi không biết liệu anh ấy có đến nhà chúng tôi vào sáng mai không. Chúng tôi đã đợi ở đây hai tiếng và vẫn chưa có tin tức gì. "
+          "Vui lòng gửi tài liệu đó cho tôi trước khi cuộc họp bắt đầu. Chính phủ đã công bố một chính sách mới cho những người sống ở khu vực đó. "
+          "Làm thế nào để sử dụng ứng dụng này đúng cách? Đây là thông tin rất quan trọng đối với tất cả chúng ta. "
+          "Họ đang làm việc ở văn phòng và sẽ về nhà tối nay. Cảm ơn bạn đã giúp đỡ và quan tâm, chúc bạn một ngày tốt lành.",
+    'pl': "Nie wiem, czy przyjdzie jutro rano do naszego domu. Czekamy tu już od dwóch godzin i wciąż nie ma żadnych wiadomości. "
+          "Proszę, wyślij mi ten dokument, zanim zacznie się spotkanie. Rząd ogłosił nową politykę dla ludzi, którzy mieszkają w tym regionie. "
+          "Jak prawidłowo korzystać z tej aplikacji? To bardzo ważna informacja dla nas wszystkich. "
+          "Oni pracują w biurze i wrócą do domu dziś wieczorem. Dziękuję za pomoc i uwagę, miłego dnia.",
+    'sv': "Jag vet inte om han kommer hem till oss i morgon bitti. Vi har väntat här i två timmar och det finns fortfarande inga nyheter. "
+          "Skicka gärna det dokumentet till mig innan mötet börjar. Regeringen har meddelat en ny policy för människorna som bor i det området. "
+          "Hur använder man den här appen på rätt sätt? Det här är mycket viktig information för oss alla. "
+          "De arbetar på kontoret och ska åka hem i kväll. Tack för din hjälp och uppmärksamhet, ha en trevlig dag.",
+    'ru': "Я не знаю, придёт ли он к нам домой завтра утром. Мы ждём здесь уже два часа, и до сих пор нет никаких новостей. "
+          "Пожалуйста, пришлите мне этот документ до начала совещания. Правительство объявило о новой политике для людей, которые живут в этом районе. "
+          "Как правильно пользоваться этим приложением? Это очень важная информация для всех нас. "
+          "Они работают в офисе и вернутся домой сегодня вечером. Спасибо за вашу помощь и внимание, хорошего дня.",
+    'uk': "Я не знаю, чи прийде він до нас додому завтра вранці. Ми чекаємо тут уже дві години, і досі немає жодних новин. "
+          "Будь ласка, надішліть мені цей документ до початку наради. Уряд оголосив про нову політику для людей, які живуть у цьому районі. "
+          "Як правильно користуватися цим застосунком? Це дуже важлива інформація для всіх нас. "
+          "Вони працюють в офісі й повернуться додому сьогодні ввечері. Дякую за вашу допомогу та увагу, гарного дня.",
+    'ar': "لا أعرف ما إذا كان سيأتي إلى منزلنا صباح الغد. نحن ننتظر هنا منذ ساعتين ولا توجد أخبار حتى الآن. "
+          "من فضلك أرسل لي تلك الوثيقة قبل بدء الاجتماع. أعلنت الحكومة عن سياسة جديدة للناس الذين يعيشون في تلك المنطقة. "
+          "كيف تستخدم هذا التطبيق بالطريقة الصحيحة؟ هذه معلومات مهمة جدا لنا جميعا. شكرا لك على مساعدتك واهتمامك.",
+    'fa': "نمی‌دانم که آیا او فردا صبح به خانه ما می‌آید یا نه. ما دو ساعت است که اینجا منتظریم و هنوز هیچ خبری نیست. "
+          "لطفا آن سند را قبل از شروع جلسه برای من بفرستید. دولت یک سیاست جدید برای مردمی که در آن منطقه زندگی می‌کنند اعلام کرد. "
+          "چگونه از این برنامه به درستی استفاده کنیم؟ این اطلاعات برای همه ما بسیار مهم است. از کمک و توجه شما متشکرم.",
+    'ms': "Saya tidak tahu sama ada dia akan datang ke rumah kami esok pagi. Kami sudah menunggu di sini selama dua jam dan masih belum ada berita. "
+          "Sila hantar dokumen itu kepada saya sebelum mesyuarat bermula. Kerajaan mengumumkan dasar baharu untuk rakyat yang tinggal di kawasan tersebut. "
+          "Bagaimanakah cara menggunakan aplikasi ini dengan betul? Ini ialah maklumat yang sangat penting untuk kita semua. "
+          "Mereka sedang bekerja di pejabat dan akan pulang malam nanti. Terima kasih atas bantuan dan perhatian anda, semoga hari anda menggembirakan.",
+    'ca': "No sé si vindrà a casa nostra demà al matí. Fa dues hores que esperem aquí i encara no hi ha notícies. "
+          "Si us plau, envia'm aquest document abans que comenci la reunió. El govern ha anunciat una nova política per a les persones que viuen en aquesta zona. "
+          "Com s'utilitza aquesta aplicació de la manera correcta? Aquesta és una informació molt important per a tots nosaltres. "
+          "Ells estan treballant a l'oficina i tornaran a casa aquesta nit. Gràcies per la teva ajuda i atenció, que tinguis un bon dia.",
+    'gl': "Non sei se virá á nosa casa mañá pola mañá. Levamos dúas horas esperando aquí e aínda non hai noticias. "
+          "Por favor, envíame ese documento antes de que comece a reunión. O goberno anunciou unha nova política para as persoas que viven nesa zona. "
+          "Como se usa esta aplicación da maneira correcta? Esta é unha información moi importante para todos nós. "
+          "Eles están a traballar na oficina e volverán para casa esta noite. Grazas pola túa axuda e atención, que teñas un bo día.",
+    'da': "Jeg ved ikke, om han kommer hjem til os i morgen tidlig. Vi har ventet her i to timer, og der er stadig ingen nyheder. "
+          "Send venligst det dokument til mig, før mødet begynder. Regeringen har annonceret en ny politik for de mennesker, der bor i det område. "
+          "Hvordan bruger man denne app på den rigtige måde? Det er meget vigtig information for os alle. "
+          "De arbejder på kontoret og tager hjem i aften. Tak for din hjælp og opmærksomhed, hav en god dag.",
+    'no': "Jeg vet ikke om han kommer hjem til oss i morgen tidlig. Vi har ventet her i to timer, og det er fortsatt ingen nyheter. "
+          "Vennligst send det dokumentet til meg før møtet begynner. Regjeringen har kunngjort en ny politikk for menneskene som bor i det området. "
+          "Hvordan bruker man denne appen på riktig måte? Dette er svært viktig informasjon for oss alle. "
+          "De jobber på kontoret og drar hjem i kveld. Takk for hjelpen og oppmerksomheten, ha en fin dag.",
+    'af': "Ek weet nie of hy môreoggend na ons huis toe sal kom nie. Ons wag al twee uur hier en daar is nog steeds geen nuus nie. "
+          "Stuur asseblief daardie dokument vir my voordat die vergadering begin. Die regering het 'n nuwe beleid aangekondig vir die mense wat in daardie gebied woon. "
+          "Hoe gebruik jy hierdie toepassing op die regte manier? Dit is baie belangrike inligting vir ons almal. "
+          "Hulle werk by die kantoor en gaan vanaand huis toe. Dankie vir jou hulp en aandag, geniet die dag.",
+    'hi': "मुझे नहीं पता कि वह कल सुबह हमारे घर आएगा या नहीं। हम यहाँ दो घंटे से इंतज़ार कर रहे हैं और अभी तक कोई खबर नहीं है। "
+          "कृपया बैठक शुरू होने से पहले वह दस्तावेज़ मुझे भेज दीजिए। सरकार ने उस इलाके में रहने वाले लोगों के लिए एक नई नीति की घोषणा की है। "
+          "इस ऐप्लिकेशन का सही तरीके से उपयोग कैसे करें? यह हम सभी के लिए बहुत महत्वपूर्ण जानकारी है। आपकी मदद और ध्यान के लिए धन्यवाद।",
+}
+
+_WORD_SPLIT = re.compile(r"[^\w']+", re.UNICODE)
+_profiles = None
+_profiles_lock = threading.Lock()
+
+def _ngrams(text, n=3):
+    grams = Counter()
+    for word in _WORD_SPLIT.split(text.lower()):
+        if not word or word.isdigit():
+            continue
+        padded = f" {word} "
+        grams[padded] += 2
+        for i in range(len(padded) - n + 1):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+def _vector(grams, top=400):
+    top_grams = grams.most_common(top)
+    norm = math.sqrt(sum(count * count for _, count in top_grams)) or 1.0
+    return {gram: count / norm for gram, count in top_grams}
+
+def _get_profiles():
+    global _profiles
+    if _profiles is None:
+        with _profiles_lock:
+            if _profiles is None:
+                _profiles = {code: _vector(_ngrams(text)) for code, text in SEED_TEXTS.items()}
+    return _profiles
+
+def _in_ranges(char, ranges):
+    code = ord(char)
+    return any(start <= code <= end for start, end in ranges)
+
+def _detect_script(letters):
+    for lang_code, ranges in SCRIPT_RANGES:
+        if sum(1 for ch in letters if _in_ranges(ch, ranges)) / len(letters) > 0.2:
+            return lang_code
+    return None
+
+def _chinese_variant(letters):
+    simplified = sum(1 for ch in letters if ch in SIMPLIFIED_MARKERS)
+    traditional = sum(1 for ch in letters if ch in TRADITIONAL_MARKERS)
+    if simplified > traditional:
+        return 'zh-cn'
+    if traditional > simplified:
+        return 'zh-tw'
+    return 'zh'
+
+def normalize_code(lang_code):
+    lang_code = (lang_code or '').lower()
+    return LANGUAGE_ALIASES.get(lang_code, lang_code)
+
+def detect_language(text):
+    letters = [ch for ch in text if ch.isalpha()]
+    if len(letters) < LANG_DETECT_MIN_CHARS:
+        return None, 0.0
+
+    script_lang = _detect_script(letters)
+    if script_lang == 'zh':
+        return _chinese_variant(letters), 1.0
+    if script_lang:
+        return script_lang, 1.0
+
+    sample = _vector(_ngrams(text[:2000]))
+    scores = []
+    for lang_code, profile in _get_profiles().items():
+        score = sum(weight * profile.get(gram, 0.0) for gram, weight in sample.items())
+        scores.append((score, lang_code))
+    scores.sort(reverse=True)
+    best_score, best_lang = scores[0]
+    runner_up = next((score for score, lang_code in scores[1:] if lang_code != CLOSE_LANGUAGES.get(best_lang)), 0.0)
+    if best_score < LANG_DETECT_MIN_SCORE or (best_score - runner_up) / best_score < LANG_DETECT_MIN_MARGIN:
+        return None, best_score
+    return best_lang, best_score
+
+def is_already_in(text, target_lang):
+    detected, _ = detect_language(text)
+    if detected is None:
+        return False
+    detected, target_lang = normalize_code(detected), normalize_code(target_lang)
+    return detected == target_lang or CLOSE_LANGUAGES.get(detected) == target_lang
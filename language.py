@@ -1,9 +1,127 @@
 import os
 import json
 import re
-import google.generativeai as genai
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from colorama import Style
-from config import SCRIPT_DIR, SUPPORTED_LANGUAGES, COLOR_INFO, COLOR_SUCCESS, COLOR_ERROR, COLOR_HEADER, COLOR_WARNING, COLOR_PROMPT, COLOR_CMD, COLOR_AI
+from config import SCRIPT_DIR, SCRIPT_VERSION, SUPPORTED_LANGUAGES, LANG_CHUNK_TOKENS, LANG_TRANSLATE_WORKERS, COLOR_INFO, COLOR_SUCCESS, COLOR_ERROR, COLOR_HEADER, COLOR_WARNING, COLOR_PROMPT, COLOR_CMD, COLOR_AI
+
+COLOR_DEFAULTS = {
+    'reset_all': Style.RESET_ALL,
+    'header_color': COLOR_HEADER,
+    'info_color': COLOR_INFO,
+    'success_color': COLOR_SUCCESS,
+    'warning_color': COLOR_WARNING,
+    'error_color': COLOR_ERROR,
+    'prompt_color': COLOR_PROMPT,
+    'cmd_color': COLOR_CMD,
+    'ai_color': COLOR_AI,
+}
+
+class CompiledCatalog:
+    _formatter = string.Formatter()
+
+    def __init__(self, strings):
+        self.source = strings
+        self.static = {}
+        self.templates = {}
+        for key, template in strings.items():
+            try:
+                bound, fields = self._bind_colors(template)
+            except (ValueError, TypeError):
+                self.templates[key] = template
+                continue
+            if fields:
+                self.templates[key] = bound
+            else:
+                self.static[key] = bound.format()
+
+    def _bind_colors(self, template):
+        pieces = []
+        fields = set()
+        for literal, field, spec, conversion in self._formatter.parse(template):
+            pieces.append(literal.replace('{', '{{').replace('}', '}}'))
+            if field is None:
+                continue
+            if field in COLOR_DEFAULTS and not spec and not conversion:
+                pieces.append(COLOR_DEFAULTS[field].replace('{', '{{').replace('}', '}}'))
+                continue
+            fields.add(field)
+            pieces.append("{" + field + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}")
+        return "".join(pieces), fields
+
+def placeholders(template):
+    try:
+        return {field for _, field, _, _ in string.Formatter().parse(template) if field is not None}
+    except ValueError:
+        return None
+
+class TranslationJob:
+    def __init__(self, manager, target_lang_code, chunk_tokens=LANG_CHUNK_TOKENS, max_workers=LANG_TRANSLATE_WORKERS):
+        self.manager = manager
+        self.target_lang_code = target_lang_code
+        self.target_file_path = manager._lang_file(target_lang_code)
+        self.chunk_tokens = chunk_tokens
+        self.max_workers = max_workers
+        self.stats = {'chunks': 0, 'failed_chunks': 0, 'translated': 0, 'rejected': 0}
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def _estimate_tokens(key, value):
+        return (len(key) + len(value)) // 4 + 4
+
+    def make_chunks(self, snippets):
+        chunks, current, current_tokens = [], {}, 0
+        for key, value in snippets.items():
+            tokens = self._estimate_tokens(key, value)
+            if current and current_tokens + tokens > self.chunk_tokens:
+                chunks.append(current)
+                current, current_tokens = {}, 0
+            current[key] = value
+            current_tokens += tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def validate(self, chunk, translated):
+        accepted = {}
+        if not isinstance(translated, dict):
+            return accepted
+        for key, source in chunk.items():
+            value = translated.get(key)
+            if isinstance(value, str) and placeholders(value) == placeholders(source):
+                accepted[key] = value
+        return accepted
+
+    def _commit(self, target_strings, accepted):
+        with self._write_lock:
+            target_strings.update(accepted)
+            tmp_path = self.target_file_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(target_strings, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.target_file_path)
+
+    def _run_chunk(self, chunk):
+        return chunk, self.manager._translate_snippets(chunk, self.target_lang_code)
+
+    def run(self, snippets, target_strings):
+        chunks = self.make_chunks(snippets)
+        total = len(chunks)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self._run_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                chunk, translated = future.result()
+                accepted = self.validate(chunk, translated)
+                self.stats['chunks'] += 1
+                self.stats['rejected'] += len(chunk) - len(accepted)
+                if not accepted:
+                    self.stats['failed_chunks'] += 1
+                    continue
+                self._commit(target_strings, accepted)
+                self.stats['translated'] += len(accepted)
+                print(f"{COLOR_INFO}[Lang] Bagian {self.stats['chunks']}/{total} beres ({len(accepted)}/{len(chunk)} teks).")
+        return self.stats
 
 class LanguageManager:
     def __init__(self, shell_instance, initial_lang_code='id'):
@@ -12,41 +130,165 @@ class LanguageManager:
         self.default_lang = 'id'
         self.current_lang_code = initial_lang_code
         self.strings = {}
+        self.catalog = CompiledCatalog({})
+        self._loaded_stamp = None
+        self._requested_lang = initial_lang_code
+        self._locks = {}
+        self._locks_guard = threading.Lock()
         os.makedirs(self.lang_dir, exist_ok=True)
-        self._sync_default_lang_file()
-        self.load_language(self.current_lang_code, translate_on_load=False)
+        if not self._apply_snapshot(self.current_lang_code, require_complete=False):
+            self._sync_default_lang_file()
+            self.load_language(self.current_lang_code, translate_on_load=False)
 
     def get(self, key, **kwargs):
-        template = self.strings.get(key, f"<{key}_NOT_FOUND>")
+        catalog = self.catalog
+        rendered = catalog.static.get(key)
+        if rendered is not None and (not kwargs or COLOR_DEFAULTS.keys().isdisjoint(kwargs)):
+            return rendered
+        template = catalog.templates.get(key)
         try:
-            kwargs.setdefault('reset_all', Style.RESET_ALL)
-            kwargs.setdefault('header_color', COLOR_HEADER)
-            kwargs.setdefault('info_color', COLOR_INFO)
-            kwargs.setdefault('success_color', COLOR_SUCCESS)
-            kwargs.setdefault('warning_color', COLOR_WARNING)
-            kwargs.setdefault('error_color', COLOR_ERROR)
-            kwargs.setdefault('prompt_color', COLOR_PROMPT)
-            kwargs.setdefault('cmd_color', COLOR_CMD)
-            kwargs.setdefault('ai_color', COLOR_AI)
-            return template.format(**kwargs)
+            if template is not None and COLOR_DEFAULTS.keys().isdisjoint(kwargs):
+                return template.format_map(kwargs)
+            template = catalog.source.get(key, f"<{key}_NOT_FOUND>")
+            return template.format_map({**COLOR_DEFAULTS, **kwargs})
         except KeyError as e:
             return f"<{key}_FORMAT_ERROR: Missing {e}>"
 
-    def load_language(self, lang_code, translate_on_load=True):
-        if lang_code != self.default_lang and translate_on_load:
-            self._update_target_lang_file(lang_code)
+    def _set_strings(self, strings):
+        self.catalog = CompiledCatalog(strings)
+        self.strings = strings
+
+    def _activate(self, prepared):
+        lang_code, strings, catalog, stamp, complete = prepared
+        self.catalog = catalog
+        self.strings = strings
+        self.current_lang_code = lang_code
+        self._loaded_stamp = (lang_code, stamp, complete) if stamp else None
+
+    def _language_lock(self, lang_code):
+        with self._locks_guard:
+            return self._locks.setdefault(lang_code, threading.Lock())
 
-        lang_file = os.path.join(self.lang_dir, f"{lang_code}.json")
+    def _lang_file(self, lang_code):
+        return os.path.join(self.lang_dir, f"{lang_code}.json")
+
+    def _snapshot_path(self, lang_code):
+        return os.path.join(self.lang_dir, '.compiled', f"{lang_code}.json")
+
+    def _source_stamp(self, lang_code):
+        stamp = {'version': SCRIPT_VERSION}
+        sources = {'master': os.path.abspath(__file__), 'default': self._lang_file(self.default_lang), 'target': self._lang_file(lang_code)}
+        for name, path in sources.items():
+            try:
+                st = os.stat(path)
+                stamp[name] = [st.st_mtime_ns, st.st_size]
+            except OSError:
+                stamp[name] = None
+        return stamp
+
+    def _is_current(self, lang_code, stamp, require_complete):
+        loaded = self._loaded_stamp
+        return bool(loaded) and loaded[:2] == (lang_code, stamp) and self.current_lang_code == lang_code and (loaded[2] or not require_complete)
+
+    def _read_snapshot(self, lang_code, stamp, require_complete):
         try:
-            with open(lang_file, 'r', encoding='utf-8') as f:
-                self.strings = json.load(f)
-            self.current_lang_code = lang_code
+            with open(self._snapshot_path(lang_code), 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if snapshot.get('stamp') != stamp or (require_complete and not snapshot.get('complete')):
+            return None
+        return snapshot
+
+    def _apply_snapshot(self, lang_code, require_complete=True):
+        stamp = self._source_stamp(lang_code)
+        snapshot = self._read_snapshot(lang_code, stamp, require_complete)
+        if not snapshot:
+            return False
+        self._activate((lang_code, snapshot['strings'], CompiledCatalog(snapshot['strings']), stamp, snapshot.get('complete')))
+        return True
+
+    def _write_snapshot(self, lang_code, strings, complete):
+        stamp = self._source_stamp(lang_code)
+        snapshot_path = self._snapshot_path(lang_code)
+        try:
+            os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+            tmp_path = snapshot_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'stamp': stamp, 'complete': complete, 'strings': strings}, f, ensure_ascii=False)
+            os.replace(tmp_path, snapshot_path)
+        except OSError:
+            pass
+        return stamp
+
+    def _read_json(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _prepare_language(self, lang_code, translate_on_load=True):
+        with self._language_lock(lang_code):
+            stamp = self._source_stamp(lang_code)
+            if self._is_current(lang_code, stamp, translate_on_load):
+                return None, True
+            snapshot = self._read_snapshot(lang_code, stamp, translate_on_load)
+            if snapshot:
+                return (lang_code, snapshot['strings'], CompiledCatalog(snapshot['strings']), stamp, snapshot.get('complete')), True
+
+            if lang_code != self.default_lang and translate_on_load:
+                self._update_target_lang_file(lang_code)
+
+            try:
+                default_strings = self._read_json(self._lang_file(self.default_lang))
+            except (json.JSONDecodeError, FileNotFoundError):
+                default_strings = self._get_master_strings()
+
+            try:
+                target_strings = default_strings if lang_code == self.default_lang else self._read_json(self._lang_file(lang_code))
+            except (json.JSONDecodeError, FileNotFoundError):
+                return (self.default_lang, default_strings, CompiledCatalog(default_strings), None, False), False
+
+            strings = {**default_strings, **target_strings}
+            complete = default_strings.keys() <= target_strings.keys()
+            stamp = self._write_snapshot(lang_code, strings, complete)
+            return (lang_code, strings, CompiledCatalog(strings), stamp, complete), True
+
+    def load_language(self, lang_code, translate_on_load=True):
+        self._requested_lang = lang_code
+        prepared, ok = self._prepare_language(lang_code, translate_on_load)
+        if prepared:
+            self._activate(prepared)
+        return ok
+
+    def load_language_async(self, lang_code, on_done=None):
+        self._requested_lang = lang_code
+
+        def worker():
+            ok = False
+            try:
+                prepared, ok = self._prepare_language(lang_code)
+                if ok and prepared and self._requested_lang == lang_code:
+                    self._activate(prepared)
+            except Exception as e:
+                print(f"{COLOR_ERROR}[Lang] Gagal nyiapin bahasa '{lang_code}': {e}")
+            if on_done:
+                on_done(lang_code, ok)
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self, lang_code):
+        stamp = self._source_stamp(lang_code)
+        return self._is_current(lang_code, stamp, True) or self._read_snapshot(lang_code, stamp, True) is not None
+
+    def prefetch(self, lang_code):
+        if self.is_ready(lang_code):
             return True
-        except (json.JSONDecodeError, FileNotFoundError):
-            if os.path.exists(os.path.join(self.lang_dir, f"{self.default_lang}.json")):
-                 with open(os.path.join(self.lang_dir, f"{self.default_lang}.json"), 'r', encoding='utf-8') as f:
-                    self.strings = json.load(f)
-            self.current_lang_code = self.default_lang
+        try:
+            _, ok = self._prepare_language(lang_code)
+            return ok
+        except Exception as e:
+            print(f"{COLOR_ERROR}[Lang] Gagal prefetch bahasa '{lang_code}': {e}")
             return False
 
     def _update_target_lang_file(self, target_lang_code):
@@ -70,14 +312,17 @@ class LanguageManager:
             return
 
         print(f"{COLOR_INFO}[Lang] Terdeteksi {len(strings_to_translate)} teks baru. Gue coba terjemahin ya...")
-        
-        translated_snippets = self._translate_snippets(strings_to_translate, target_lang_code)
+        if not self.shell or not self.shell.ai_model:
+            print(f"{COLOR_ERROR}[AI/Lang] Model AI utama belum siap untuk nerjemahin.")
+            return
 
-        if translated_snippets:
-            target_strings.update(translated_snippets)
-            with open(target_file_path, 'w', encoding='utf-8') as f:
-                json.dump(target_strings, f, indent=4, ensure_ascii=False)
+        job = TranslationJob(self, target_lang_code)
+        stats = job.run(strings_to_translate, target_strings)
+
+        if stats['translated'] == len(strings_to_translate):
             print(f"{COLOR_SUCCESS}[Lang] Berhasil! File '{target_lang_code}.json' udah di-update.")
+        elif stats['translated']:
+            print(f"{COLOR_WARNING}[Lang] {stats['translated']}/{len(strings_to_translate)} teks tersimpan di '{target_lang_code}.json'. Sisanya dilanjutin pas bahasa ini dimuat lagi.")
 
     def _translate_snippets(self, snippets, target_lang_code):
         if not snippets:
@@ -98,8 +343,8 @@ class LanguageManager:
                 f"Here is the JSON object with the strings to translate:\n\n{json.dumps(snippets, indent=2, ensure_ascii=False)}"
             )
             
-            response = model.generate_content(prompt, generation_config=genai.types.GenerationConfig(temperature=0.1))
-            cleaned_response_text = re.sub(r'```json\n|```', '', response.text).strip()
+            response_text = model.generate(prompt, temperature=0.1)
+            cleaned_response_text = re.sub(r'```json\n|```', '', response_text).strip()
             return json.loads(cleaned_response_text)
         except Exception as e:
             print(f"{COLOR_ERROR}[AI/Lang] Gagal pas proses nerjemahin dan nyimpen: {e}")
@@ -188,13 +433,35 @@ class LanguageManager:
             "status_winget_feat_ok": "{success_color}Tersedia (CLI){reset_all}",
             "status_winget_feat_no": "{warning_color}Tidak Tersedia{reset_all}",
             "status_detected_apps_label": "  Aplikasi Terdeteksi: {count}",
+            "status_clipboard_queue_label": "  Antrian Clipboard: {depth} antri | {processed} diproses | {dropped} dibuang",
             "status_session_header": "\n{header_color}--- SESI, AI & CACHE ---{reset_all}",
             "status_ai_model_label": "  Model AI         : {model}",
             "status_target_lang_label": "  Bahasa Target    : {lang}",
             "status_history_label": "  History Sesi     : {count} item",
+            "status_history_tokens_label": "  Ukuran History   : ~{tokens} token (budget {budget}) | dipadatkan {compactions}x, hemat ~{saved} token",
+            "status_startup_label": "  Startup          : {report}",
+            "status_startup_value": "prompt siap {repl:.0f} ms, AI siap {ai:.0f} ms",
+            "status_router_label": "  Router Lokal     : {hits}/{inputs} perintah langsung tanpa AI ({rate:.0f}%)",
+            "status_tool_cache_label": "  Cache Alat       : {report}",
+            "status_tool_cache_value": "{hits} hit / {misses} miss ({stale} basi) | {recent} dari {traced} panggilan terakhir dari cache",
+            "status_latency_label": "  Latensi AI       : {report}",
+            "status_tool_selection_label": "  Subset Alat      : {report}",
+            "status_tool_selection_value": "hemat ~{saved:.0f}% token deklarasi ({sent}/{full} token) | fallback ke semua alat {fallback:.0f}% dari {requests} request",
+            "status_round_trips_label": "  Round Trip AI    : {report}",
+            "status_round_trips_value": "{direct} cmd langsung | loop alat {loop} cmd, rata {loop_avg:.1f} RT | rencana {plan} cmd, rata {plan_avg:.1f} RT",
+            "status_tool_results_label": "  Hasil Alat ke AI : {report}",
+            "status_tool_results_value": "~{raw} token mentah -> ~{sent} token dikirim ({saved:.0f}% hemat)",
+            "status_watchdog_label": "  Watchdog Alat    : {timeouts} timeout | {interrupted} dibatalin pakai Ctrl+C",
+            "status_model_scheduler_label": "  Antrian AI       : {report}",
+            "status_model_scheduler_value": "{requests} request | {retries} retry | nunggu limit {throttled:.1f} dtk | hedge {hedge_wins}/{hedges} menang | {failures} gagal",
+            "status_latency_value": "TTFT {ttft:.0f} ms (rata-rata {avg:.0f} ms) | respons terakhir {total:.0f} ms | {count} request",
             "status_cache_label": "  Cache Terjemahan : {report}",
             "status_stats_label": "  Statistik Sesi   : {api} (API) | {cache} (Cache)",
+            "status_skipped_label": "  Deteksi Bahasa   : {skipped} terjemahan dilewati (sudah dalam bahasa target)",
+            "status_cache_counters_label": "  Counter Cache    : {hits} hit | {misses} miss | {evictions} evict | {expired} expired",
             "lang_changed": "[Bahasa] Target bahasa diubah ke: {lang_code} ({lang_name})",
+            "lang_loading_background": "{info_color}[Bahasa] Lagi nyiapin {lang_name} ({lang_code}) di background. Interface tetap pakai bahasa sekarang sampai siap.",
+            "lang_switch_failed": "[Bahasa] Gagal ganti bahasa ke {lang_code}.",
             "lang_invalid": "[AI] Maaf, kode bahasa '{code}' gak valid. Pilihan: {choices}",
             "help_header": "{header_color}--- DAFTAR PERINTAH SMART SHELL ---",
             "help_subtitle": "Lo bisa panggil perintah-perintah ini pake bahasa biasa.\n",
@@ -248,6 +515,9 @@ class LanguageManager:
             "help_desc_pecah_file": "(FILE) Memecah file besar jadi modular pake penanda '## path/file.py ##'.",
             "help_desc_elevate_to_admin": "(ADMIN) Meminta hak akses admin dengan me-restart script (jika belum admin).",
             "help_desc_run_dism": "(ADMIN) Menjalankan perintah DISM yang aman (ScanHealth, CheckHealth, RestoreHealth).",
+            "help_desc_halaman_berikutnya": "(AI) Ngambil halaman lanjutan dari hasil alat yang kepanjangan pakai token lanjutan.",
+            "help_desc_jalankan_rencana": "(AI) Jalanin rencana beberapa langkah alat sekaligus secara lokal (JSON array, `{{{{N}}}}` = hasil langkah ke-N).",
+            "help_desc_perf": "(STATUS) Nampilin latensi p50/p95/p99 dan ukuran payload per alat, panggilan AI, dan HTTP di sesi ini.",
             "help_desc_set_registry_value": "(ADMIN-BAHAYA) Mengubah value di Windows Registry.",
             "help_desc_dapatkan_konteks_os": "(INFO) Mengambil dan menampilkan konteks OS saat ini (direktori, file, dll).",
             "exit_message": "\n{ai_color}Smart Shell: Oke, gue cabut dulu ya. Kalo butuh lagi, panggil aja!",
@@ -403,6 +673,34 @@ class LanguageManager:
             "prompt": "\n{reset_all}{blue_color}{cwd}{reset_all}{prompt_color}\n> ",
             "ai_not_active": "{error_color}[AI Error] Fitur AI tidak aktif.",
             "thinking": "[AI] Berpikir...",
+            "result_page_notice": "[HASIL DIPOTONG: halaman {page}/{pages}, {shown}/{total} karakter. Kalau butuh lanjutannya, panggil halaman_berikutnya(token='{token}').]",
+            "result_page_last": "[AKHIR HASIL: halaman {page}/{pages}.]",
+            "result_page_invalid_token": "Error: token halaman '{token}' nggak dikenal atau hasilnya udah habis/kedaluwarsa.",
+            "perf_header": "{header_color}--- PERFORMA SESI ({spans} span, log: {path}) ---",
+            "perf_columns": "  Span                           Jml    p50 ms    p95 ms    p99 ms    In KB   Out KB  Err",
+            "perf_row": "  {name:<28} {count:>5} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {bytes_in:>8.1f} {bytes_out:>8.1f} {errors:>4}",
+            "perf_empty": "Belum ada data performa di sesi ini.",
+            "startup_profile_header": "{header_color}--- Startup profile ({ms:.0f} ms sampai prompt) ---",
+            "startup_tasks_header": "{header_color}--- Task startup paralel (mulai +ms / durasi ms) ---",
+            "startup_task_waiting": "nunggu {deps}",
+            "startup_task_failed": "GAGAL: {error}",
+            "startup_task_running": "(masih jalan)",
+            "startup_lazy_header": "{header_color}--- Lazy module yang udah ke-load ---",
+            "startup_lazy_empty": "{info_color}  (belum ada)",
+            "ai_still_starting": "AI masih nyiapin sesi, bentar ya...",
+            "tool_cancelled": "[Dibatalin] Alat '{name}' dihentiin user (Ctrl+C) setelah {seconds:.1f} detik. Sesi tetep jalan.",
+            "tool_timed_out": "[Timeout] Alat '{name}' dibatalin karena lewat batas {timeout} detik.",
+            "tool_cancel_notice": "{warning_color}{message}",
+            "tool_partial_result": "Hasil sebagian sebelum dihentiin:\n{result}",
+            "tool_runner_full": "[Ditolak] Alat '{name}' nggak dijalanin: masih ada {count} alat lama yang nyangkut dan nggak bisa dihentiin. Tunggu bentar atau restart shell.",
+            "plan_running": "{info_color}[Rencana] Jalanin {count} langkah secara lokal...",
+            "plan_invalid": "Error: rencana nggak valid ({e}). Kirim JSON array kayak [{{\"alat\": \"nama_alat\", \"args\": {{...}}}}].",
+            "plan_summary": "Rencana: {done}/{total} langkah sukses.",
+            "plan_step_result": "[{number}] {name} -> {status}\n{result}",
+            "plan_stopped": "Rencana berhenti di langkah {number}, {remaining} langkah sisanya nggak dijalanin. Perbaiki atau kasih tau user.",
+            "ai_request_failed": "{error_color}[AI Error] Request ke AI gagal setelah {attempts}x percobaan: {e}",
+            "ai_tool_results_pending": "{warning_color}[AI] Hasil alat ({count}) masih disimpan, bakal dikirim ulang di perintah berikutnya.",
+            "ai_resuming_tool_results": "{info_color}[AI] Ngirim ulang {count} hasil alat yang sempet gagal dikirim...",
             "tool_not_found": "{warning_color}[AI Error] AI mencoba memanggil fungsi '{name}' yang tidak ada.",
             "ai_response": "{ai_color}Smart Shell: {text}",
             "ai_response_blocked": "\n{warning_color}[AI] Respons dari AI kosong atau diblokir. Alasan: {feedback}",
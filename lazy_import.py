@@ -0,0 +1,45 @@
+import time
+import importlib
+import importlib.util
+import threading
+
+LOAD_TIMES = {}
+_lock = threading.Lock()
+
+class LazyModule:
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with _lock:
+                module = self._module
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    LOAD_TIMES[self._name] = time.perf_counter() - started
+                    object.__setattr__(self, '_module', module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def available(self):
+        if self._module is not None:
+            return True
+        try:
+            return importlib.util.find_spec(self._name) is not None
+        except (ImportError, ValueError):
+            return False
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_module(name):
+    return LazyModule(name)
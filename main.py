@@ -1,14 +1,51 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
 import os
 import sys
 import platform
 import ctypes
-import time
 import json
 
 from config import SCRIPT_DIR, CONFIG_FILENAME, SCRIPT_VERSION, COLOR_WARNING, COLOR_ERROR, Style
 from language import LanguageManager
 from utils import handle_first_run_consent, is_admin
 from shell import AI_Shell
+from lazy_import import LOAD_TIMES
+from startup import StartupOrchestrator
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+class StartupProfile:
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.phases = [('imports', _IMPORT_SECONDS)]
+        self.started = time.perf_counter()
+
+    def mark(self, label):
+        now = time.perf_counter()
+        self.phases.append((label, now - self.started))
+        self.started = now
+
+    def report(self, lang, startup=None):
+        if not self.enabled:
+            return
+        total = sum(seconds for _, seconds in self.phases)
+        print(lang.get('startup_profile_header', ms=total * 1000))
+        for label, seconds in self.phases:
+            print(f"  {label:<22}: {seconds * 1000:8.1f} ms")
+        if startup:
+            print(lang.get('startup_tasks_header'))
+            for name, offset, duration, deps, error in startup.timings():
+                if offset is None:
+                    print(f"  {name:<22}: {lang.get('startup_task_waiting', deps=', '.join(deps))}")
+                    continue
+                status = f" {lang.get('startup_task_failed', error=error)}" if error else ("" if startup.is_done(name) else f" {lang.get('startup_task_running')}")
+                print(f"  {name:<22}: +{offset * 1000:7.1f} / {duration * 1000:8.1f}{status}")
+        print(lang.get('startup_lazy_header'))
+        for name, seconds in sorted(LOAD_TIMES.items(), key=lambda item: -item[1]):
+            print(f"  {name:<22}: {seconds * 1000:8.1f} ms")
+        if not LOAD_TIMES:
+            print(lang.get('startup_lazy_empty'))
 
 def _load_config_early():
     if os.path.exists(CONFIG_FILENAME):
@@ -20,11 +57,17 @@ def _load_config_early():
     return {'last_language': 'id'}
 
 def main():
+    profile = StartupProfile('--profile-startup' in sys.argv)
     os.chdir(SCRIPT_DIR)
     config = _load_config_early()
     lang = LanguageManager(None, config.get('last_language', 'id'))
+    profile.mark('language')
+    startup = StartupOrchestrator()
+    if platform.system() != "Windows" or is_admin():
+        AI_Shell.warm_up(startup, lang, config)
     
     handle_first_run_consent(lang)
+    profile.mark('consent')
 
     if platform.system() == "Windows":
         if not is_admin():
@@ -38,8 +81,11 @@ def main():
             sys.exit(0)
     
     ctypes.windll.kernel32.SetConsoleTitleW(f"Smart Shell v{SCRIPT_VERSION} [ADMIN]")
-    shell = AI_Shell(lang_manager=lang, initial_config=config)
-    lang.load_language(lang.current_lang_code)
+    shell = AI_Shell(lang_manager=lang, initial_config=config, startup=startup)
+    profile.mark('shell')
+    lang.load_language(lang.current_lang_code, translate_on_load=False)
+    profile.mark('load_language')
+    profile.report(lang, startup)
     shell.run()
 
 if __name__ == "__main__":
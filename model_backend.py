@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+
+ModelChunk = namedtuple('ModelChunk', ['text', 'calls'])
+
+class ReplayExhausted(Exception):
+    pass
+
+class ModelBackend:
+    model_name = "unknown"
+
+    def start_chat(self, history):
+        raise NotImplementedError
+
+    def generate(self, prompt, temperature=None, timeout=None):
+        raise NotImplementedError
+
+class ChatHandle:
+    last_feedback = None
+
+    @property
+    def history(self):
+        return []
+
+    def send(self, messages, stream=True, timeout=None, tools=None):
+        raise NotImplementedError
+
+    def send_tool_results(self, results, stream=True, timeout=None, tools=None):
+        raise NotImplementedError
+
+class GeminiBackend(ModelBackend):
+    @staticmethod
+    def preload():
+        import google.generativeai
+        import google.generativeai.protos
+
+    def __init__(self, api_key, model_name, tools):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name, tools=tools)
+        self.model_name = self.model.model_name
+
+    def start_chat(self, history):
+        return GeminiChat(self.model.start_chat(history=history))
+
+    def generate(self, prompt, temperature=None, timeout=None):
+        import google.generativeai as genai
+        options = {'request_options': {'timeout': timeout}} if timeout else {}
+        if temperature is not None:
+            options['generation_config'] = genai.types.GenerationConfig(temperature=temperature)
+        return self.model.generate_content(prompt, **options).text
+
+class GeminiChat(ChatHandle):
+    def __init__(self, session):
+        self.session = session
+        self.last_feedback = None
+
+    @property
+    def history(self):
+        return self.session.history
+
+    @staticmethod
+    def _to_chunk(response):
+        text, calls = [], []
+        if response.candidates and response.candidates[0].content.parts:
+            for part in response.candidates[0].content.parts:
+                if part.function_call:
+                    calls.append((part.function_call.name, dict(part.function_call.args)))
+                elif part.text:
+                    text.append(part.text)
+        return ModelChunk("".join(text), calls)
+
+    def _send(self, content, stream, timeout, tools):
+        self.last_feedback = None
+        options = {'request_options': {'timeout': timeout}} if timeout else {}
+        if tools is not None:
+            options['tools'] = tools
+        response = self.session.send_message(content, stream=stream, **options)
+        for chunk in (response if stream else [response]):
+            yield self._to_chunk(chunk)
+        self.last_feedback = getattr(response, 'prompt_feedback', None) or None
+
+    def send(self, messages, stream=True, timeout=None, tools=None):
+        return self._send(messages, stream, timeout, tools)
+
+    def send_tool_results(self, results, stream=True, timeout=None, tools=None):
+        import google.generativeai.protos as glm
+        parts = [glm.Part(function_response=glm.FunctionResponse(name=tool_name, response={'result': tool_result})) for tool_name, tool_result in results]
+        return self._send(parts, stream, timeout, tools)
+
+class RecordingBackend(ModelBackend):
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.path = path
+        self.model_name = inner.model_name
+        self._lock = threading.Lock()
+
+    def start_chat(self, history):
+        return RecordingChat(self, self.inner.start_chat(history))
+
+    def generate(self, prompt, temperature=None, timeout=None):
+        started = time.perf_counter()
+        text = self.inner.generate(prompt, temperature, timeout)
+        elapsed = time.perf_counter() - started
+        self.write({'kind': 'generate', 'content': [prompt], 'chunks': [{'text': text, 'calls': []}], 'ttft': elapsed, 'total': elapsed, 'feedback': None})
+        return text
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+class RecordingChat(ChatHandle):
+    def __init__(self, backend, inner):
+        self.backend = backend
+        self.inner = inner
+
+    @property
+    def history(self):
+        return self.inner.history
+
+    def _record(self, kind, content, chunks):
+        started = time.perf_counter()
+        ttft = None
+        recorded = []
+        for chunk in chunks:
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            recorded.append({'text': chunk.text, 'calls': [[name, args] for name, args in chunk.calls]})
+            yield chunk
+        self.last_feedback = self.inner.last_feedback
+        self.backend.write({
+            'kind': kind, 'content': content, 'chunks': recorded,
+            'ttft': ttft or 0.0, 'total': time.perf_counter() - started,
+            'feedback': str(self.last_feedback) if self.last_feedback else None,
+        })
+
+    def send(self, messages, stream=True, timeout=None, tools=None):
+        return self._record('message', list(messages), self.inner.send(messages, stream, timeout, tools))
+
+    def send_tool_results(self, results, stream=True, timeout=None, tools=None):
+        return self._record('tool_results', [[name, result] for name, result in results], self.inner.send_tool_results(results, stream, timeout, tools))
+
+class ReplayBackend(ModelBackend):
+    def __init__(self, path, latency_scale=1.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.model_name = f"replay:{os.path.basename(path)}"
+        with open(path, 'r', encoding='utf-8') as f:
+            self.records = [json.loads(line) for line in f if line.strip()]
+        self.cursor = 0
+        self.generate_cursor = 0
+        self.stats = {'replayed': 0, 'skipped': 0}
+        self._lock = threading.Lock()
+
+    def user_messages(self):
+        return [record['content'][-1] for record in self.records if record['kind'] == 'message' and record['content']]
+
+    def rewind(self):
+        with self._lock:
+            self.cursor = 0
+            self.generate_cursor = 0
+
+    def next_record(self, kind):
+        with self._lock:
+            while self.cursor < len(self.records):
+                record = self.records[self.cursor]
+                self.cursor += 1
+                if record['kind'] == kind:
+                    self.stats['replayed'] += 1
+                    return record
+                self.stats['skipped'] += 1
+        raise ReplayExhausted(f"No more '{kind}' records in {self.path}")
+
+    def start_chat(self, history):
+        return ReplayChat(self)
+
+    def generate(self, prompt, temperature=None, timeout=None):
+        with self._lock:
+            while self.generate_cursor < len(self.records):
+                record = self.records[self.generate_cursor]
+                self.generate_cursor += 1
+                if record['kind'] == 'generate':
+                    self.stats['replayed'] += 1
+                    break
+            else:
+                raise ReplayExhausted(f"No more 'generate' records in {self.path}")
+        delay = record.get('total', 0.0) * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+        return "".join(chunk['text'] for chunk in record['chunks'])
+
+class ReplayChat(ChatHandle):
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _replay(self, kind):
+        record = self.backend.next_record(kind)
+        scale = self.backend.latency_scale
+        chunks = record['chunks'] or [{'text': '', 'calls': []}]
+        ttft = record.get('ttft', 0.0) * scale
+        gap = max(0.0, record.get('total', 0.0) * scale - ttft) / len(chunks)
+        self.last_feedback = None
+        for index, chunk in enumerate(chunks):
+            delay = ttft if index == 0 else gap
+            if delay > 0:
+                time.sleep(delay)
+            yield ModelChunk(chunk['text'], [(name, args) for name, args in chunk['calls']])
+        self.last_feedback = record.get('feedback')
+
+    def send(self, messages, stream=True, timeout=None, tools=None):
+        return self._replay('message')
+
+    def send_tool_results(self, results, stream=True, timeout=None, tools=None):
+        return self._replay('tool_results')
@@ -0,0 +1,210 @@
+import time
+import queue
+import random
+import threading
+from model_backend import ModelBackend, ChatHandle
+from config import MODEL_RPM, MODEL_BURST, MODEL_MAX_RETRIES, MODEL_BACKOFF_BASE, MODEL_BACKOFF_MAX, MODEL_CALL_DEADLINE, MODEL_HEDGE_AFTER
+
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_NAMES = {'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable', 'InternalServerError', 'DeadlineExceeded', 'GatewayTimeout', 'BadGateway', 'RetryError'}
+
+class ModelRequestError(Exception):
+    def __init__(self, message, cause=None, attempts=0):
+        super().__init__(message)
+        self.cause = cause
+        self.attempts = attempts
+
+def is_retryable(error):
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    code = getattr(error, 'code', None)
+    if isinstance(code, int) and code in RETRYABLE_CODES:
+        return True
+    return type(error).__name__ in RETRYABLE_NAMES
+
+class TokenBucket:
+    def __init__(self, rate_per_minute=MODEL_RPM, burst=MODEL_BURST):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, deadline=None):
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            if deadline is not None and now + delay > deadline:
+                raise ModelRequestError("Rate limit wait would exceed the request deadline")
+            time.sleep(delay)
+            waited += delay
+
+class ScheduledBackend(ModelBackend):
+    def __init__(self, primary, fallback=None, limiter=None, max_retries=MODEL_MAX_RETRIES, backoff_base=MODEL_BACKOFF_BASE, backoff_max=MODEL_BACKOFF_MAX, deadline=MODEL_CALL_DEADLINE, hedge_after=MODEL_HEDGE_AFTER):
+        self.primary = primary
+        self.fallback = fallback
+        self.limiter = limiter or TokenBucket()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.model_name = primary.model_name
+        self.stats = {'requests': 0, 'retries': 0, 'throttled_seconds': 0.0, 'hedges': 0, 'hedge_wins': 0, 'failures': 0}
+        self._lock = threading.Lock()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def backoff(self, attempt):
+        return min(self.backoff_base * (2 ** attempt), self.backoff_max) * random.uniform(0.5, 1.5)
+
+    def retry_delay(self, error, attempt, deadline, retryable=True):
+        retry = retryable and is_retryable(error) and attempt < self.max_retries
+        delay = self.backoff(attempt) if retry else 0
+        if not retry or time.monotonic() + delay >= deadline:
+            self.count('failures')
+            raise ModelRequestError(f"{type(error).__name__}: {error}", cause=error, attempts=attempt + 1) from error
+        self.count('retries')
+        return delay
+
+    def start_chat(self, history):
+        return ScheduledChat(self, self.primary.start_chat(history))
+
+    def generate(self, prompt, temperature=None, timeout=None):
+        self.count('requests')
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                self.count('throttled_seconds', self.limiter.acquire(deadline))
+                return self.primary.generate(prompt, temperature, max(0.1, deadline - time.monotonic()))
+            except ModelRequestError:
+                self.count('failures')
+                raise
+            except Exception as e:
+                time.sleep(self.retry_delay(e, attempt, deadline))
+                attempt += 1
+
+class ScheduledChat(ChatHandle):
+    def __init__(self, scheduler, inner):
+        self.scheduler = scheduler
+        self.inner = inner
+        self.last_feedback = None
+
+    @property
+    def history(self):
+        return self.inner.history
+
+    def _open(self, chat, call, deadline):
+        self.scheduler.count('throttled_seconds', self.scheduler.limiter.acquire(deadline))
+        return iter(call(chat, max(0.1, deadline - time.monotonic())))
+
+    def _pump(self, source, chunks, events):
+        try:
+            for chunk in chunks:
+                events.put((source, 'chunk', chunk))
+            events.put((source, 'done', None))
+        except Exception as e:
+            events.put((source, 'error', e))
+
+    def _hedged(self, call, deadline):
+        scheduler = self.scheduler
+        events = queue.Queue()
+        chats = {'primary': self.inner}
+        history = list(self.inner.history)
+        threading.Thread(target=lambda: self._start('primary', self.inner, call, deadline, events), daemon=True).start()
+        running = {'primary'}
+        winner = None
+        last_error = None
+        hedge_at = time.monotonic() + scheduler.hedge_after
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                raise TimeoutError("Model request deadline exceeded")
+            wait = deadline - now
+            if winner is None and 'fallback' not in chats:
+                wait = min(wait, max(0.0, hedge_at - now))
+            try:
+                source, kind, payload = events.get(timeout=wait)
+            except queue.Empty:
+                if winner is None and 'fallback' not in chats and time.monotonic() >= hedge_at:
+                    scheduler.count('hedges')
+                    chats['fallback'] = scheduler.fallback.start_chat(history)
+                    running.add('fallback')
+                    threading.Thread(target=lambda: self._start('fallback', chats['fallback'], call, deadline, events), daemon=True).start()
+                continue
+            if winner is not None and source != winner:
+                continue
+            if kind == 'error':
+                running.discard(source)
+                last_error = payload
+                if winner is not None or not running:
+                    raise last_error
+                continue
+            if winner is None:
+                winner = source
+                if winner == 'fallback':
+                    scheduler.count('hedge_wins')
+            if kind == 'done':
+                break
+            yield payload
+        chat = chats[winner]
+        self.last_feedback = chat.last_feedback
+        if winner == 'fallback':
+            self.inner = scheduler.primary.start_chat(chat.history)
+
+    def _start(self, source, chat, call, deadline, events):
+        try:
+            chunks = self._open(chat, call, deadline)
+        except Exception as e:
+            events.put((source, 'error', e))
+            return
+        self._pump(source, chunks, events)
+
+    def _direct(self, call, deadline):
+        for chunk in self._open(self.inner, call, deadline):
+            yield chunk
+        self.last_feedback = self.inner.last_feedback
+
+    def _schedule(self, call):
+        scheduler = self.scheduler
+        scheduler.count('requests')
+        deadline = time.monotonic() + scheduler.deadline
+        attempt = 0
+        while True:
+            produced = False
+            try:
+                if scheduler.fallback is not None and scheduler.hedge_after:
+                    chunks = self._hedged(call, deadline)
+                else:
+                    chunks = self._direct(call, deadline)
+                for chunk in chunks:
+                    produced = True
+                    yield chunk
+                return
+            except ModelRequestError:
+                scheduler.count('failures')
+                raise
+            except Exception as e:
+                time.sleep(scheduler.retry_delay(e, attempt, deadline, retryable=not produced))
+                attempt += 1
+
+    def send(self, messages, stream=True, timeout=None, tools=None):
+        return self._schedule(lambda chat, remaining: chat.send(messages, stream, remaining, tools))
+
+    def send_tool_results(self, results, stream=True, timeout=None, tools=None):
+        return self._schedule(lambda chat, remaining: chat.send_tool_results(results, stream, remaining, tools))
@@ -0,0 +1,83 @@
+import re
+import json
+from tool_result import is_failure
+from tracing import tracer
+
+REFERENCE = re.compile(r"\{\{\s*(\d+)\s*\}\}")
+
+PLAN_PROMPT = """8.  **MODE RENCANA:** Kalau permintaan butuh 2 langkah atau lebih yang urutannya udah jelas, JANGAN panggil alatnya satu-satu. Panggil `jalankan_rencana` SEKALI dengan JSON array langkah, contoh: [{"alat": "ganti_direktori", "args": {"tujuan": "D:/proyek"}}, {"alat": "baca_file", "args": {"file_path": "catatan.txt"}}]. Pakai `{{N}}` di dalam argumen buat masukin hasil langkah ke-N. Semua langkah dijalanin lokal; kalau ada yang gagal, rencana berhenti dan lo dapet laporannya buat diperbaiki.
+"""
+
+class PlanError(Exception):
+    pass
+
+class PlanExecutor:
+    def __init__(self, scheduler, lang):
+        self.scheduler = scheduler
+        self.lang = lang
+        self.stats = {'plans': 0, 'steps': 0, 'failures': 0, 'invalid': 0}
+
+    def parse(self, plan):
+        steps = json.loads(plan) if isinstance(plan, str) else plan
+        if isinstance(steps, dict):
+            steps = steps.get('langkah', steps.get('steps'))
+        if not isinstance(steps, list) or not steps:
+            raise PlanError("rencana harus berupa JSON array langkah yang nggak kosong")
+        parsed = []
+        for index, step in enumerate(steps, 1):
+            if not isinstance(step, dict) or not isinstance(step.get('alat', step.get('tool')), str):
+                raise PlanError(f"langkah {index} harus punya 'alat'")
+            args = step.get('args', {})
+            if not isinstance(args, dict):
+                raise PlanError(f"'args' di langkah {index} harus object")
+            name = step.get('alat', step.get('tool'))
+            if name == 'jalankan_rencana' or self.scheduler._resolve(name) is None:
+                raise PlanError(f"alat '{name}' di langkah {index} nggak tersedia")
+            parsed.append((name, args))
+        return parsed
+
+    @classmethod
+    def substitute(cls, value, outputs):
+        if isinstance(value, str):
+            def replace(match):
+                number = int(match.group(1))
+                if number not in outputs:
+                    raise PlanError(f"referensi {{{{{number}}}}} menunjuk langkah yang belum jalan")
+                return outputs[number]
+            return REFERENCE.sub(replace, value)
+        if isinstance(value, dict):
+            return {key: cls.substitute(item, outputs) for key, item in value.items()}
+        if isinstance(value, list):
+            return [cls.substitute(item, outputs) for item in value]
+        return value
+
+    def run(self, plan):
+        self.stats['plans'] += 1
+        try:
+            steps = self.parse(plan)
+        except (ValueError, PlanError) as e:
+            self.stats['invalid'] += 1
+            return self.lang.get('plan_invalid', e=e)
+        print(self.lang.get('plan_running', count=len(steps)))
+        outputs, report, succeeded = {}, [], 0
+        with tracer.span('plan', steps=len(steps)) as span:
+            for number, (name, args) in enumerate(steps, 1):
+                self.stats['steps'] += 1
+                try:
+                    result = self.scheduler.invoke(name, self.substitute(args, outputs), paged=False)
+                    failed = is_failure(result)
+                    result = self.scheduler.text_for_model(name, result)
+                except Exception as e:
+                    result, failed = f"Error: {e}", True
+                outputs[number] = result
+                report.append(self.lang.get('plan_step_result', number=number, name=name, status='GAGAL' if failed else 'OK', result=result))
+                if not failed:
+                    succeeded += 1
+                else:
+                    self.stats['failures'] += 1
+                    span['failed_step'] = number
+                    report.append(self.lang.get('plan_stopped', number=number, remaining=len(steps) - number))
+                    break
+            span['done'] = succeeded
+        report.insert(0, self.lang.get('plan_summary', done=succeeded, total=len(steps)))
+        return "\n".join(report)
@@ -0,0 +1,61 @@
+import uuid
+import threading
+from collections import OrderedDict
+from config import RESULT_PAGE_CHARS, RESULT_PAGER_MAX_RESULTS
+
+class ResultPager:
+    def __init__(self, lang_manager, page_chars=RESULT_PAGE_CHARS, tool_limits=None, max_results=RESULT_PAGER_MAX_RESULTS):
+        self.lang = lang_manager
+        self.page_chars = page_chars
+        self.tool_limits = tool_limits or {}
+        self.max_results = max_results
+        self.results = OrderedDict()
+        self.stats = {'paged': 0, 'pages_served': 0, 'chars_held_back': 0}
+        self._lock = threading.Lock()
+
+    def limit_for(self, tool_name):
+        return self.tool_limits.get(tool_name, self.page_chars)
+
+    @staticmethod
+    def _cut(text, start, limit):
+        end = start + limit
+        if end >= len(text):
+            return len(text)
+        newline = text.rfind("\n", start, end)
+        return newline + 1 if newline > start + limit // 2 else end
+
+    def _page(self, token, entry):
+        text, start, limit = entry['text'], entry['offset'], entry['limit']
+        end = self._cut(text, start, limit)
+        entry['offset'] = end
+        entry['page'] += 1
+        page = text[start:end]
+        if end >= len(text):
+            self.results.pop(token, None)
+            return page + "\n" + self.lang.get('result_page_last', page=entry['page'], pages=entry['page'])
+        pages = entry['page'] + -(-(len(text) - end) // limit)
+        return page + "\n" + self.lang.get('result_page_notice', page=entry['page'], pages=pages, shown=end, total=len(text), token=token)
+
+    def paginate(self, tool_name, result):
+        limit = self.limit_for(tool_name)
+        if not isinstance(result, str) or not limit or len(result) <= limit:
+            return result
+        token = uuid.uuid4().hex[:8]
+        entry = {'tool': tool_name, 'text': result, 'offset': 0, 'page': 0, 'limit': limit}
+        with self._lock:
+            self.results[token] = entry
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+            self.stats['paged'] += 1
+            page = self._page(token, entry)
+            self.stats['chars_held_back'] += len(result) - entry['offset']
+            return page
+
+    def next_page(self, token):
+        with self._lock:
+            entry = self.results.get(token.strip())
+            if entry is None:
+                return self.lang.get('result_page_invalid_token', token=token)
+            self.results.move_to_end(token.strip())
+            self.stats['pages_served'] += 1
+            return self._page(token.strip(), entry)
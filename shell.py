@@ -10,22 +10,36 @@ import webbrowser
 import platform
 import ctypes
 import subprocess
-import winreg
 import shutil
-import psutil
-from PIL import ImageGrab
 from colorama import Fore, Style
-import google.generativeai as genai
-import google.generativeai.protos as glm
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
 from config import *
+from lazy_import import lazy_module
 from language import LanguageManager
 from utils import Translator, NVDA_Handler, Clipboard_Monitor, is_admin
 from app_manager import AppManager
+from tool_scheduler import ToolScheduler, read_only, unpaged, verbatim
+from tool_result import ToolResult, failed
+from tool_watchdog import current_token, ToolCancelled
+from tool_cache import memoize
+from history_manager import HistoryManager
+from command_router import CommandRouter
+from tool_selector import ToolSelector, TOOL_CATEGORIES
+from plan_executor import PlanExecutor, PLAN_PROMPT
+from model_backend import GeminiBackend, RecordingBackend, ReplayBackend
+from model_scheduler import ScheduledBackend, TokenBucket, ModelRequestError
+from startup import StartupOrchestrator
+from tracing import tracer, traced_input
+
+psutil = lazy_module('psutil')
+winreg = lazy_module('winreg')
+ImageGrab = lazy_module('PIL.ImageGrab')
+win32gui = lazy_module('win32gui')
+win32con = lazy_module('win32con')
+win32process = lazy_module('win32process')
 
 class AI_Shell:
-    def __init__(self, lang_manager, initial_config=None):
+    def __init__(self, lang_manager, initial_config=None, startup=None):
         self.script_path = os.path.abspath(__file__)
         self.lang = lang_manager
         
@@ -36,15 +50,65 @@ class AI_Shell:
         
         self.start_time = time.time()
         self.pid = os.getpid()
-        self.translator = Translator(self.lang)
+        tracer.enabled = self.config.get('tracing', True)
+        self.startup = startup or StartupOrchestrator()
+        self.warm_up(self.startup, self.lang, self.config)
         self.nvda = NVDA_Handler(self.lang)
         self.monitoring_enabled = False
-        self.app_manager = AppManager(self.lang)
+        self.pending_notices = []
+        self.pending_tool_results = None
+        self.idle_event = threading.Event()
+        self.latency_stats = {'requests': 0, 'ttft_total': 0.0, 'ttft_last': None, 'total_last': None}
+        self.restored_state = None
+        self._chat_session = None
         self.clipboard_monitor = Clipboard_Monitor(self)
-        self.session_restored = self._load_state_after_elevation()
-        self.ai_model, self.chat_session = self._initialize_ai_session()
+        self.history_manager = HistoryManager(budget=self.config.get('history_token_budget', HISTORY_TOKEN_BUDGET), keep_turns=self.config.get('history_keep_turns', HISTORY_KEEP_TURNS))
         self.lang.shell = self
         self.tools = self._get_tool_list()
+        self.tool_scheduler = ToolScheduler(self)
+        self.plan_executor = PlanExecutor(self.tool_scheduler, self.lang)
+        self.round_trip_stats = {mode: {'commands': 0, 'round_trips': 0} for mode in ('direct', 'loop', 'plan')}
+        self.current_command = None
+        self.tool_selector = ToolSelector(self.tools, self.config.get('tool_select_max_categories', TOOL_SELECT_MAX_CATEGORIES))
+        self.active_tools = None
+        self.command_router = CommandRouter(self)
+        self.startup.add('state', self._load_state_after_elevation)
+        self.startup.add('app_manager', lambda: AppManager(self.lang))
+        self.startup.add('ai_session', self._initialize_ai_session, deps=('state', 'translator', 'model_import'))
+        self.startup.mark('shell')
+
+    @staticmethod
+    def warm_up(startup, lang_manager, config):
+        if not startup.has('model_import'):
+            startup.add('model_import', lambda: GeminiBackend.preload() if config.get('model_backend', 'gemini') == 'gemini' else None)
+        if not startup.has('translator'):
+            startup.add('translator', lambda: Translator(lang_manager, config))
+
+    @property
+    def translator(self):
+        return self.startup.result('translator')
+
+    @property
+    def app_manager(self):
+        return self.startup.result('app_manager')
+
+    @property
+    def session_restored(self):
+        return self.startup.result('state')
+
+    @property
+    def ai_model(self):
+        return self.startup.result('ai_session')[0]
+
+    @property
+    def chat_session(self):
+        if self._chat_session is None:
+            self._chat_session = self.startup.result('ai_session')[1]
+        return self._chat_session
+
+    @chat_session.setter
+    def chat_session(self, value):
+        self._chat_session = value
 
     def _load_config(self):
         if os.path.exists(CONFIG_FILENAME):
@@ -65,17 +129,20 @@ class AI_Shell:
             json.dump(self.config, f, indent=4)
 
     def _get_tool_list(self):
-        return [
-            self.speak, self.pause, self.resume, self.mute, self.unmute, self.status, self.change_language, self.help, self.clear_cache, self.exit, self.restart_program,
+        tools = [
+            self.speak, self.pause, self.resume, self.mute, self.unmute, self.status, self.perf, self.change_language, self.help, self.clear_cache, self.exit, self.restart_program,
             self.buka_website, self.buka_app, self.buka_file, self.buka_pengaturan,
             self.daftar_file, self.direktori_sekarang, self.ganti_direktori, self.buat_folder, self.baca_file, self.tulis_file, self.copy_file, self.move_file, self.rename_file, self.delete_file,
             self.daftar_aplikasi, self.cari_aplikasi, self.install_aplikasi,
             self.info_sistem, self.info_sistem_lengkap, self.info_powerplan, self.ganti_powerplan, self.dapatkan_konteks_os,
             self.kunci_windows, self.shutdown_sistem, self.batal_shutdown,
             self.daftar_proses, self.hentikan_proses, self.cari_program_hang,
-            self.jalankan_perintah, self.unduh_file, self.ambil_screenshot, self.pecah_file,
+            self.jalankan_perintah, self.unduh_file, self.ambil_screenshot, self.pecah_file, self.halaman_berikutnya,
             self.elevate_to_admin, self.run_dism, self.set_registry_value
         ]
+        if self.config.get('plan_mode', True):
+            tools.append(self.jalankan_rencana)
+        return tools
 
     def _save_state_for_elevation(self):
         print(self.lang.get('state_saving', filename=os.path.basename(STATE_FILENAME)))
@@ -115,13 +182,34 @@ class AI_Shell:
         self.restored_state = None
         return False
 
+    def _create_backend(self):
+        if self.config.get('model_backend', 'gemini') == 'replay':
+            backend = ReplayBackend(self.config['replay_file'], self.config.get('replay_latency_scale', 1.0))
+        else:
+            if not GOOGLE_AI_API_KEY or "PASTE_API_KEY" in GOOGLE_AI_API_KEY:
+                print(f"{COLOR_ERROR}{self.lang.get('ai_key_missing')}")
+                return None
+            backend = GeminiBackend(GOOGLE_AI_API_KEY, self.config.get('model_name', GEMINI_MODEL_NAME), self._get_tool_list())
+        if self.config.get('record_session'):
+            backend = RecordingBackend(backend, self.config['record_session'])
+        if self.config.get('model_scheduler', True):
+            fallback = None
+            if self.config.get('hedge_model') and self.config.get('model_backend', 'gemini') != 'replay':
+                fallback = GeminiBackend(GOOGLE_AI_API_KEY, self.config['hedge_model'], self._get_tool_list())
+            limiter = TokenBucket(self.config.get('model_rpm', MODEL_RPM), self.config.get('model_burst', MODEL_BURST))
+            backend = ScheduledBackend(
+                backend, fallback, limiter,
+                max_retries=self.config.get('model_max_retries', MODEL_MAX_RETRIES),
+                deadline=self.config.get('model_call_deadline', MODEL_CALL_DEADLINE),
+                hedge_after=self.config.get('hedge_after', MODEL_HEDGE_AFTER),
+            )
+        return backend
+
     def _initialize_ai_session(self):
-        if not GOOGLE_AI_API_KEY or "PASTE_API_KEY" in GOOGLE_AI_API_KEY:
-            print(f"{COLOR_ERROR}{self.lang.get('ai_key_missing')}")
-            return None, None
         try:
-            genai.configure(api_key=GOOGLE_AI_API_KEY)
-            model = genai.GenerativeModel('gemini-1.5-flash-latest', tools=self._get_tool_list())
+            model = self._create_backend()
+            if model is None:
+                return None, None
             system_prompt = """Lo adalah asisten OS yang cerdas. Misi utama lo adalah memahami maksud user dan mengeksekusi perintah menggunakan 'alat' (fungsi Python) yang tersedia seefisien mungkin.
 
 IKUTI ATURAN INI SECARA KETAT:
@@ -141,19 +229,22 @@ IKUTI ATURAN INI SECARA KETAT:
     d. Setelah SEMUA alat berhasil dijalankan dan lo siap memberikan rangkuman akhirnya.
 7.  **GAYA BAHASA:** Selalu gunakan 'lo-gue', santai, dan to the point.
 """
+            if self.config.get('plan_mode', True):
+                system_prompt += PLAN_PROMPT
             
             chat_history = []
+            display_language = self.lang.current_lang_code
             if self.session_restored and self.restored_state:
                 print(self.lang.get('state_restoring_history'))
                 chat_history = self.restored_state['chat_history']
                 self.monitoring_enabled = self.restored_state['monitoring_enabled']
                 self.nvda.is_muted = self.restored_state['is_muted']
                 self.translator.target_language = self.restored_state['target_language']
-                self.lang.load_language(self.restored_state.get('display_language', 'id'))
+                display_language = self.restored_state.get('display_language', 'id')
             else:
                 chat_history = [{'role': 'user', 'parts': [system_prompt]}, {'role': 'model', 'parts': ["Oke, gue siap."]}]
 
-            initial_lang_name = SUPPORTED_LANGUAGES.get(self.lang.current_lang_code, 'Indonesian')
+            initial_lang_name = SUPPORTED_LANGUAGES.get(display_language, 'Indonesian')
             initial_lang_prompt = f"System Notification: The session is starting. Your conversational responses must be in {initial_lang_name} to match the user's interface language, unless the user asks for something in another language."
             chat_history.append({'role': 'user', 'parts': [initial_lang_prompt]})
             chat_history.append({'role': 'model', 'parts': [f"OK, I will respond in {initial_lang_name}."]})
@@ -164,13 +255,16 @@ IKUTI ATURAN INI SECARA KETAT:
             print(f"{COLOR_ERROR}{self.lang.get('ai_init_fail', e=e)}")
             return None, None
 
+    @read_only
+    @memoize(watch=lambda: ".")
     def dapatkan_konteks_os(self):
         try:
             cwd = os.getcwd()
             files = os.listdir(cwd)
             os_info = f"{platform.system()} {platform.release()}"
             user_info = os.getlogin()
-            admin_status = self.lang.get('status_privileges_admin') if is_admin() else self.lang.get('status_privileges_standard')
+            admin = is_admin()
+            admin_status = self.lang.get('status_privileges_admin') if admin else self.lang.get('status_privileges_standard')
 
             report_lines = [
                 self.lang.get('os_context_header'),
@@ -184,7 +278,7 @@ IKUTI ATURAN INI SECARA KETAT:
                 report_lines.append(self.lang.get('os_context_file_item', item=item))
             
             report = "\n".join(report_lines)
-            return report
+            return ToolResult({'cwd': cwd, 'os': os_info, 'user': user_info, 'admin': admin, 'files': files}, report)
         except Exception as e:
             return f"Gagal mendapatkan konteks OS: {e}"
 
@@ -211,6 +305,7 @@ IKUTI ATURAN INI SECARA KETAT:
         self.nvda.pipe_found = True
         return self.lang.get('mute_off')
 
+    @read_only
     def status(self):
         status_admin = self.lang.get('status_privileges_admin') if is_admin() else self.lang.get('status_privileges_standard')
         uptime_seconds = time.time() - self.start_time
@@ -233,10 +328,43 @@ IKUTI ATURAN INI SECARA KETAT:
         num_apps_found = len(self.app_manager.installed_apps)
         model_name = self.ai_model.model_name.split('/')[-1] if self.ai_model else "N/A"
         history_len = len(self.chat_session.history) if self.chat_session else "N/A"
+        history_stats = self.history_manager.stats
+        history_tokens = self.history_manager.estimate_tokens(self.chat_session.history) if self.chat_session else 0
         
-        cache_size_kb = 0
-        if os.path.exists(CACHE_FILENAME): cache_size_kb = os.path.getsize(CACHE_FILENAME) / 1024
+        cache_size_kb = self.translator.cache.size_on_disk() / 1024
         cache_report = f"{len(self.translator.cache)} entri ({cache_size_kb:.2f} KB)"
+        cache_counters = self.translator.cache.stats()
+        clipboard_worker = self.clipboard_monitor.worker
+        latency = self.latency_stats
+        router_stats = self.command_router.stats
+        startup_ai = self.startup.elapsed('ai_session')
+        startup_report = self.lang.get('status_startup_value', repl=self.startup.milestones.get('repl', 0) * 1000, ai=startup_ai * 1000 if startup_ai is not None else 0)
+        tool_cache = self.tool_scheduler.result_cache
+        if tool_cache is not None:
+            recent_hits = sum(1 for entry in self.tool_scheduler.trace if entry['cached'])
+            tool_cache_report = self.lang.get('status_tool_cache_value', hits=tool_cache.stats['hits'], misses=tool_cache.stats['misses'], stale=tool_cache.stats['stale'], recent=recent_hits, traced=len(self.tool_scheduler.trace))
+        else:
+            tool_cache_report = "OFF"
+        if latency['requests']:
+            latency_report = self.lang.get('status_latency_value', ttft=latency['ttft_last'] * 1000, avg=latency['ttft_total'] / latency['requests'] * 1000, total=latency['total_last'] * 1000, count=latency['requests'])
+        else:
+            latency_report = "N/A"
+        round_trips = {mode: (stats['commands'], stats['round_trips'] / stats['commands'] if stats['commands'] else 0.0) for mode, stats in self.round_trip_stats.items()}
+        round_trip_report = self.lang.get('status_round_trips_value', direct=round_trips['direct'][0], loop=round_trips['loop'][0], loop_avg=round_trips['loop'][1], plan=round_trips['plan'][0], plan_avg=round_trips['plan'][1])
+        scheduler_stats = self.tool_scheduler.stats
+        watchdog_stats = self.tool_scheduler.watchdog.stats
+        raw_tokens, model_tokens = scheduler_stats['chars_raw'] // HISTORY_CHARS_PER_TOKEN, scheduler_stats['chars_model'] // HISTORY_CHARS_PER_TOKEN
+        tool_results_report = self.lang.get('status_tool_results_value', raw=raw_tokens, sent=model_tokens, saved=(raw_tokens - model_tokens) / raw_tokens * 100 if raw_tokens else 0.0)
+        selector = self.tool_selector
+        if self.config.get('tool_selection', True):
+            selection_report = self.lang.get('status_tool_selection_value', saved=selector.saved_percent(), sent=selector.stats['tokens_sent'], full=selector.stats['tokens_full'], fallback=selector.fallback_rate(), requests=selector.stats['requests'])
+        else:
+            selection_report = "OFF"
+        if isinstance(self.ai_model, ScheduledBackend):
+            sched = self.ai_model.stats
+            scheduler_report = self.lang.get('status_model_scheduler_value', requests=sched['requests'], retries=sched['retries'], throttled=sched['throttled_seconds'], hedges=sched['hedges'], hedge_wins=sched['hedge_wins'], failures=sched['failures'])
+        else:
+            scheduler_report = "OFF"
         
         report = (
             f"\n{self.lang.get('status_report_header', version=SCRIPT_VERSION)}\n"
@@ -245,6 +373,7 @@ IKUTI ATURAN INI SECARA KETAT:
             f"{self.lang.get('status_python_label', version=python_version)}\n"
             f"{self.lang.get('status_ram_label', ram=mem_report)}\n"
             f"{self.lang.get('status_uptime_label')}{uptime_str}\n"
+            f"{self.lang.get('status_startup_label', report=startup_report)}\n"
             f"{self.lang.get('status_cwd_label', cwd=os.getcwd())}\n"
             f"\n{self.lang.get('status_features_header')}\n"
             f"{self.lang.get('status_autotranslate_label')}{status_mon}\n"
@@ -252,12 +381,24 @@ IKUTI ATURAN INI SECARA KETAT:
             f"{self.lang.get('status_nvda_conn_label')}{status_nvda}\n"
             f"{self.lang.get('status_winget_feat_label')}{status_winget}\n"
             f"{self.lang.get('status_detected_apps_label', count=num_apps_found)}\n"
+            f"{self.lang.get('status_clipboard_queue_label', depth=clipboard_worker.depth(), processed=clipboard_worker.stats['processed'], dropped=clipboard_worker.stats['dropped'])}\n"
             f"\n{self.lang.get('status_session_header')}\n"
             f"{self.lang.get('status_ai_model_label', model=model_name)}\n"
             f"{self.lang.get('status_target_lang_label', lang=self.lang.current_lang_code.upper())}\n"
             f"{self.lang.get('status_history_label', count=history_len)}\n"
+            f"{self.lang.get('status_history_tokens_label', tokens=history_tokens, budget=self.history_manager.budget, compactions=history_stats['compactions'], saved=history_stats['tokens_saved'])}\n"
+            f"{self.lang.get('status_latency_label', report=latency_report)}\n"
+            f"{self.lang.get('status_round_trips_label', report=round_trip_report)}\n"
+            f"{self.lang.get('status_model_scheduler_label', report=scheduler_report)}\n"
+            f"{self.lang.get('status_tool_selection_label', report=selection_report)}\n"
+            f"{self.lang.get('status_tool_results_label', report=tool_results_report)}\n"
+            f"{self.lang.get('status_watchdog_label', timeouts=watchdog_stats['timeouts'], interrupted=watchdog_stats['interrupted'])}\n"
+            f"{self.lang.get('status_tool_cache_label', report=tool_cache_report)}\n"
+            f"{self.lang.get('status_router_label', hits=router_stats['hits'], inputs=router_stats['inputs'], rate=self.command_router.hit_rate())}\n"
             f"{self.lang.get('status_cache_label', report=cache_report)}\n"
-            f"{self.lang.get('status_stats_label', api=stats['api'], cache=stats['cache'])}"
+            f"{self.lang.get('status_stats_label', api=stats['api'], cache=stats['cache'])}\n"
+            f"{self.lang.get('status_skipped_label', skipped=stats['skipped'])}\n"
+            f"{self.lang.get('status_cache_counters_label', hits=cache_counters['hits'], misses=cache_counters['misses'], evictions=cache_counters['evictions'], expired=cache_counters['expired'])}"
         )
         print(report)
         return report
@@ -265,38 +406,63 @@ IKUTI ATURAN INI SECARA KETAT:
     def change_language(self, language_code:str):
         language_code = language_code.lower()
         if language_code in SUPPORTED_LANGUAGES:
-            if self.lang.load_language(language_code):
-                self.translator.target_language = language_code
-                self.config['last_language'] = language_code
-                self._save_config()
-                lang_name = SUPPORTED_LANGUAGES[language_code]
-                msg = self.lang.get('lang_changed', lang_code=language_code.upper(), lang_name=lang_name)
-                try:
-                    self.chat_session.send_message(f"System Notification: User has switched the interface language to {lang_name}. From now on, your conversational responses must also be in {lang_name}.")
-                except Exception: pass
-                print(f"{COLOR_SUCCESS}{msg}")
-                return msg
-            else:
-                return f"Gagal ganti bahasa ke {language_code}."
+            lang_name = SUPPORTED_LANGUAGES[language_code]
+            if self.lang.is_ready(language_code):
+                if self.lang.load_language(language_code):
+                    return self._finish_language_change(language_code)
+                msg = self.lang.get('lang_switch_failed', lang_code=language_code.upper())
+                print(f"{COLOR_ERROR}{msg}")
+                return failed(msg)
+            self.lang.load_language_async(language_code, self._on_language_loaded)
+            msg = self.lang.get('lang_loading_background', lang_code=language_code.upper(), lang_name=lang_name)
+            print(f"{COLOR_INFO}{msg}")
+            return msg
         else:
             supported_keys = ", ".join(list(SUPPORTED_LANGUAGES.keys()))
             msg = self.lang.get('lang_invalid', code=language_code, choices=supported_keys)
             print(f"{COLOR_ERROR}{msg}")
-            return msg
+            return failed(msg)
+
+    def _finish_language_change(self, language_code):
+        self.translator.target_language = language_code
+        self.config['last_language'] = language_code
+        self._save_config()
+        lang_name = SUPPORTED_LANGUAGES[language_code]
+        msg = self.lang.get('lang_changed', lang_code=language_code.upper(), lang_name=lang_name)
+        self.pending_notices.append(f"System Notification: User has switched the interface language to {lang_name}. From now on, your conversational responses must also be in {lang_name}.")
+        print(f"{COLOR_SUCCESS}{msg}")
+        return msg
+
+    def _on_language_loaded(self, language_code, ok):
+        if ok and self.lang.current_lang_code == language_code:
+            self._finish_language_change(language_code)
+        elif not ok:
+            print(f"{COLOR_ERROR}{self.lang.get('lang_switch_failed', lang_code=language_code.upper())}")
+
+    def _after_ai_ready(self):
+        display_language = self.lang.current_lang_code
+        if self.session_restored and self.restored_state:
+            display_language = self.restored_state.get('display_language', 'id')
+        if display_language != self.lang.current_lang_code or not self.lang.is_ready(display_language):
+            self.lang.load_language(display_language)
+        if not self.ai_model: 
+            print(self.lang.get('shell_ai_fail'))
+        elif self.config.get('prefetch_languages'):
+            threading.Thread(target=self._prefetch_languages, daemon=True).start()
 
+    def _prefetch_languages(self):
+        for language_code in self.config.get('prefetch_languages', []):
+            if language_code not in SUPPORTED_LANGUAGES or language_code == self.lang.current_lang_code:
+                continue
+            self.idle_event.wait()
+            self.lang.prefetch(language_code)
 
     def help(self):
         output = []
         output.append(f"{self.lang.get('help_header')}")
         output.append(self.lang.get('help_subtitle'))
         
-        kategori = {
-            self.lang.get('help_cat_system'): ["status", "exit", "restart_program", "elevate_to_admin", "info_sistem", "info_sistem_lengkap", "dapatkan_konteks_os"],
-            self.lang.get('help_cat_files'): ["daftar_file", "direktori_sekarang", "ganti_direktori", "buat_folder", "baca_file", "tulis_file", "copy_file", "move_file", "rename_file", "delete_file", "pecah_file"],
-            self.lang.get('help_cat_apps'): ["buka_app", "daftar_aplikasi", "cari_aplikasi", "install_aplikasi", "buka_website", "unduh_file"],
-            self.lang.get('help_cat_power'): ["info_powerplan", "ganti_powerplan", "shutdown_sistem", "batal_shutdown", "kunci_windows", "daftar_proses", "hentikan_proses", "cari_program_hang"],
-            self.lang.get('help_cat_other'): ["speak", "pause", "resume", "mute", "unmute", "clear_cache", "change_language", "ambil_screenshot", "jalankan_perintah", "run_dism", "set_registry_value"]
-        }
+        kategori = {self.lang.get(f'help_cat_{category}'): tool_names for category, tool_names in TOOL_CATEGORIES.items()}
         
         all_tools_map = {func.__name__: func for func in self.tools}
         
@@ -317,6 +483,21 @@ IKUTI ATURAN INI SECARA KETAT:
         print(final_output)
         return self.lang.get('help_displayed')
 
+    @read_only
+    def perf(self):
+        rows = tracer.summary()
+        if not rows:
+            msg = self.lang.get('perf_empty')
+            print(msg)
+            return msg
+        output = [self.lang.get('perf_header', spans=tracer.span_count, path=tracer.path)]
+        output.append(self.lang.get('perf_columns'))
+        for row in rows:
+            output.append(self.lang.get('perf_row', name=row['name'][:28], count=row['count'], p50=row['p50'], p95=row['p95'], p99=row['p99'], bytes_in=row['bytes_in'] / 1024, bytes_out=row['bytes_out'] / 1024, errors=row['errors']))
+        report = "\n".join(output)
+        print(report)
+        return report
+
     def clear_cache(self):
         return self.translator.clear_cache()
 
@@ -325,9 +506,9 @@ IKUTI ATURAN INI SECARA KETAT:
         sys.exit(0)
 
     def restart_program(self):
-        konfirmasi = input(self.lang.get('restart_confirm')).lower()
+        konfirmasi = traced_input(self.lang.get('restart_confirm')).lower()
         if konfirmasi != 'y':
-            return self.lang.get('restart_cancelled')
+            return failed(self.lang.get('restart_cancelled'))
         
         try:
             self._save_config()
@@ -336,7 +517,7 @@ IKUTI ATURAN INI SECARA KETAT:
         except Exception as e:
             err_msg = self.lang.get('restart_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def buka_website(self, url: str):
         try:
@@ -346,7 +527,7 @@ IKUTI ATURAN INI SECARA KETAT:
         except Exception as e:
             err_msg = self.lang.get('web_open_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def buka_app(self, app_name: str):
         return self.app_manager.launch_app(app_name)
@@ -359,12 +540,13 @@ IKUTI ATURAN INI SECARA KETAT:
         except FileNotFoundError:
             err_msg = self.lang.get('file_not_found', path=file_path)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         except Exception as e:
             err_msg = self.lang.get('file_open_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
+    @read_only
     def direktori_sekarang(self):
         return os.getcwd()
 
@@ -376,34 +558,41 @@ IKUTI ATURAN INI SECARA KETAT:
         except FileNotFoundError:
             err_msg = self.lang.get('cd_fail_not_found', dest=tujuan)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         except Exception as e:
             err_msg = self.lang.get('cd_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
+    @read_only
+    @memoize(watch=lambda direktori=".": direktori)
     def daftar_file(self, direktori: str = "."):
         try:
             path = os.path.abspath(os.path.expanduser(direktori))
             header = self.lang.get('ls_header', path=path)
             files = os.listdir(path)
             report = f"{header}\n" + "\n".join(files)
-            return report
+            return ToolResult(f"{path}\n" + "\n".join(files), report)
         except FileNotFoundError:
             err_msg = self.lang.get('ls_fail_not_found', path=direktori)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         except Exception as e:
             err_msg = self.lang.get('ls_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
+    @read_only
+    @memoize()
     def info_sistem(self):
+        user = os.getlogin()
         report = f"""{self.lang.get('sysinfo_header')}
-{self.lang.get('sysinfo_user', user=os.getlogin())}
+{self.lang.get('sysinfo_user', user=user)}
 {self.lang.get('sysinfo_os', os_name=platform.system(), os_release=platform.release())}"""
-        return report
+        return ToolResult({'user': user, 'os': f"{platform.system()} {platform.release()}"}, report)
 
+    @read_only
+    @memoize(ttl=15)
     def info_sistem_lengkap(self):
         try:
             cpu_usage = psutil.cpu_percent(interval=1)
@@ -415,11 +604,16 @@ IKUTI ATURAN INI SECARA KETAT:
 {self.lang.get('sysinfo_ram_used', used=ram.used / (1024**3), percent=ram.percent)}
 {self.lang.get('sysinfo_disk_total', total=disk.total / (1024**3))}
 {self.lang.get('sysinfo_disk_used', used=disk.used / (1024**3), percent=disk.percent)}"""
-            return report
+            data = {
+                'cpu_percent': cpu_usage,
+                'ram_gb': {'total': round(ram.total / (1024**3), 1), 'used': round(ram.used / (1024**3), 1), 'percent': ram.percent},
+                'disk_gb': {'total': round(disk.total / (1024**3), 1), 'used': round(disk.used / (1024**3), 1), 'percent': disk.percent},
+            }
+            return ToolResult(data, report)
         except Exception as e:
             err_msg = self.lang.get('sysinfo_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def kunci_windows(self):
         time.sleep(1)
@@ -436,23 +630,23 @@ IKUTI ATURAN INI SECARA KETAT:
         else:
             err_msg = self.lang.get('shutdown_unit_invalid', unit=unit)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         command_map = {'mati': f'shutdown /s /t {int(delay_detik)}', 'restart': f'shutdown /r /t {int(delay_detik)}', 'hibernate': 'shutdown /h', 'sleep': 'rundll32.exe powrprof.dll,SetSuspendState 0,1,0'}
         if mode_lower not in command_map:
             err_msg = self.lang.get('shutdown_mode_invalid', mode=mode)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         delay_text = f" dalam {waktu} {unit}" if mode_lower not in ['hibernate', 'sleep'] else ""
-        konfirmasi = input(self.lang.get('shutdown_confirm', mode=mode_lower, delay_text=delay_text)).lower()
+        konfirmasi = traced_input(self.lang.get('shutdown_confirm', mode=mode_lower, delay_text=delay_text)).lower()
         if konfirmasi != 'y':
-            return self.lang.get('shutdown_cancelled', mode=mode_lower)
+            return failed(self.lang.get('shutdown_cancelled', mode=mode_lower))
         try:
             os.system(command_map[mode_lower])
             return self.lang.get('shutdown_success', mode=mode_lower)
         except Exception as e:
             err_msg = self.lang.get('shutdown_fail', mode=mode_lower, e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def batal_shutdown(self):
         try:
@@ -461,11 +655,11 @@ IKUTI ATURAN INI SECARA KETAT:
         except subprocess.CalledProcessError:
             warn_msg = self.lang.get('abort_shutdown_fail_none')
             print(f"{COLOR_WARNING}{warn_msg}")
-            return warn_msg
+            return failed(warn_msg)
         except Exception as e:
             err_msg = self.lang.get('abort_shutdown_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def buka_pengaturan(self, halaman: str):
         mapping = {'bluetooth': 'bluetooth', 'display': 'display', 'tampilan': 'display', 'update': 'windowsupdate', 'akun': 'yourinfo', 'jaringan': 'network-status', 'wifi': 'network-wifi', 'power': 'powersleep', 'baterai': 'powersleep'}
@@ -474,12 +668,15 @@ IKUTI ATURAN INI SECARA KETAT:
         os.system(f'start {uri}')
         return self.lang.get('settings_open_success', page=halaman)
 
+    @read_only
+    @memoize()
     def cari_aplikasi(self, nama_aplikasi: str):
         return self.app_manager.winget_search(nama_aplikasi)
 
     def install_aplikasi(self, id_paket: str):
         return self.app_manager.winget_install(id_paket)
 
+    @read_only
     def daftar_aplikasi(self):
         count = len(self.app_manager.installed_apps)
         header = self.lang.get('app_list_header', count=count)
@@ -489,7 +686,7 @@ IKUTI ATURAN INI SECARA KETAT:
         else:
             app_names = [app_info['name'] for app_info in sorted(self.app_manager.installed_apps.values(), key=lambda x: x['name'])]
             report = f"{header}\n" + "\n".join(app_names)
-            return report
+            return ToolResult("\n".join(app_names), report)
 
     def copy_file(self, source_path: str, destination_path: str):
         try:
@@ -500,11 +697,11 @@ IKUTI ATURAN INI SECARA KETAT:
         except FileNotFoundError:
             err_msg = self.lang.get('copy_fail_not_found', src=source_path, dest=destination_path)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         except Exception as e:
             err_msg = self.lang.get('copy_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def move_file(self, source_path: str, destination_path: str):
         try:
@@ -515,11 +712,11 @@ IKUTI ATURAN INI SECARA KETAT:
         except FileNotFoundError:
             err_msg = self.lang.get('move_fail_not_found', src=source_path)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         except Exception as e:
             err_msg = self.lang.get('move_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def rename_file(self, old_path: str, new_name: str):
         try:
@@ -532,30 +729,30 @@ IKUTI ATURAN INI SECARA KETAT:
         except FileNotFoundError:
             err_msg = self.lang.get('rename_fail_not_found', old=old_path)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         except Exception as e:
             err_msg = self.lang.get('rename_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def delete_file(self, path: str):
         try:
             target_path = os.path.abspath(os.path.expanduser(path))
             if not os.path.exists(target_path): raise FileNotFoundError
-            konfirmasi = input(self.lang.get('delete_confirm', path=target_path)).lower()
+            konfirmasi = traced_input(self.lang.get('delete_confirm', path=target_path)).lower()
             if konfirmasi != 'y':
-                return self.lang.get('delete_cancelled')
+                return failed(self.lang.get('delete_cancelled'))
             if os.path.isfile(target_path): os.remove(target_path)
             elif os.path.isdir(target_path): shutil.rmtree(target_path)
             return self.lang.get('delete_success', path=target_path)
         except FileNotFoundError:
             err_msg = self.lang.get('delete_fail_not_found', path=path)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         except Exception as e:
             err_msg = self.lang.get('delete_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def elevate_to_admin(self):
         if is_admin():
@@ -568,7 +765,7 @@ IKUTI ATURAN INI SECARA KETAT:
             err_msg = self.lang.get('elevate_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
             if os.path.exists(STATE_FILENAME): os.remove(STATE_FILENAME)
-            return err_msg
+            return failed(err_msg)
 
     def run_dism(self, command: str):
         allowed_commands = ["scanhealth", "checkhealth", "restorehealth"]
@@ -576,18 +773,21 @@ IKUTI ATURAN INI SECARA KETAT:
         if cmd_lower not in allowed_commands:
             err_msg = self.lang.get('dism_invalid_command', cmd=command)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         if not is_admin():
             warn_msg = self.lang.get('dism_needs_admin')
             print(f"{COLOR_WARNING}{warn_msg}")
-            return warn_msg
+            return failed(warn_msg)
         full_command = f"DISM /Online /Cleanup-Image /{cmd_lower}"
-        konfirmasi = input(self.lang.get('dism_confirm', full_cmd=full_command)).lower()
+        konfirmasi = traced_input(self.lang.get('dism_confirm', full_cmd=full_command)).lower()
         if konfirmasi != 'y':
-            return self.lang.get('dism_cancelled')
+            return failed(self.lang.get('dism_cancelled'))
         try:
             print(f"{COLOR_INFO}{self.lang.get('dism_executing', full_cmd=full_command)}")
             process = subprocess.Popen(full_command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8', errors='replace')
+            token = current_token()
+            if token is not None:
+                token.register(process)
             while True:
                 output = process.stdout.readline()
                 if output == '' and process.poll() is not None: break
@@ -597,17 +797,17 @@ IKUTI ATURAN INI SECARA KETAT:
             else:
                 err_msg = self.lang.get('dism_fail_code', code=process.poll())
                 print(f"{COLOR_ERROR}{err_msg}")
-                return err_msg
+                return failed(err_msg)
         except Exception as e:
             err_msg = self.lang.get('dism_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def set_registry_value(self, root_key: str, sub_key: str, value_name: str, value_data: str, value_type: str):
         if not is_admin():
             warn_msg = self.lang.get('registry_needs_admin')
             print(f"{COLOR_WARNING}{warn_msg}")
-            return warn_msg
+            return failed(warn_msg)
         root_map = { "hkcu": winreg.HKEY_CURRENT_USER, "hklm": winreg.HKEY_LOCAL_MACHINE }
         type_map = { "string": winreg.REG_SZ, "dword": winreg.REG_DWORD }
         root_key_lower = root_key.lower()
@@ -615,26 +815,26 @@ IKUTI ATURAN INI SECARA KETAT:
         if root_key_lower not in root_map:
             err_msg = self.lang.get('registry_invalid_root', key=root_key)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         if value_type_lower not in type_map:
             err_msg = self.lang.get('registry_invalid_type', type=value_type)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         reg_root = root_map[root_key_lower]
         reg_type = type_map[value_type_lower]
         try: data = int(value_data) if reg_type == winreg.REG_DWORD else str(value_data)
         except ValueError:
             err_msg = self.lang.get('registry_type_error', data=value_data, type=value_type)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         full_path = f"{root_key.upper()}\\{sub_key}"
         print(self.lang.get('registry_warning_header'))
         print(self.lang.get('registry_warning_path', path=full_path))
         print(self.lang.get('registry_warning_name', name=value_name))
         print(self.lang.get('registry_warning_data', data=data, type=value_type))
-        konfirmasi = input(self.lang.get('registry_confirm')).lower()
+        konfirmasi = traced_input(self.lang.get('registry_confirm')).lower()
         if konfirmasi != 'y':
-            return self.lang.get('registry_cancelled')
+            return failed(self.lang.get('registry_cancelled'))
         try:
             key = winreg.CreateKey(reg_root, sub_key)
             winreg.SetValueEx(key, value_name, 0, reg_type, data)
@@ -643,18 +843,19 @@ IKUTI ATURAN INI SECARA KETAT:
         except Exception as e:
             err_msg = self.lang.get('registry_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
+    @read_only
     def daftar_proses(self):
         try:
             header = self.lang.get('ps_header')
-            process_list = [f"{p.info['pid']} - {p.info['name']}" for p in psutil.process_iter(['pid', 'name'])]
-            report = f"{header}\n" + "\n".join(process_list)
-            return report
+            processes = [(p.info['pid'], p.info['name']) for p in psutil.process_iter(['pid', 'name'])]
+            report = f"{header}\n" + "\n".join(f"{pid} - {name}" for pid, name in processes)
+            return ToolResult("pid name\n" + "\n".join(f"{pid} {name}" for pid, name in processes), report)
         except Exception as e:
             err_msg = self.lang.get('ps_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def hentikan_proses(self, identifier: str):
         try:
@@ -670,12 +871,12 @@ IKUTI ATURAN INI SECARA KETAT:
             if not found_process:
                 err_msg = self.lang.get('kill_not_found', id=identifier)
                 print(f"{COLOR_ERROR}{err_msg}")
-                return err_msg
+                return failed(err_msg)
             
             proc_name = found_process.name()
-            konfirmasi = input(self.lang.get('kill_confirm', name=proc_name, pid=found_process.pid)).lower()
+            konfirmasi = traced_input(self.lang.get('kill_confirm', name=proc_name, pid=found_process.pid)).lower()
             if konfirmasi != 'y':
-                return self.lang.get('kill_cancelled')
+                return failed(self.lang.get('kill_cancelled'))
             found_process.terminate()
             time.sleep(0.5)
             if found_process.is_running(): found_process.kill()
@@ -683,8 +884,9 @@ IKUTI ATURAN INI SECARA KETAT:
         except Exception as e:
             err_msg = self.lang.get('kill_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
+    @read_only
     def cari_program_hang(self):
         try:
             hanging_pids = set()
@@ -699,24 +901,31 @@ IKUTI ATURAN INI SECARA KETAT:
                 return self.lang.get('hang_scan_safe')
             
             report_lines = [self.lang.get('hang_scan_found_header', count=len(hanging_pids))]
+            hanging = []
             for pid in hanging_pids:
                 try:
                     p = psutil.Process(pid)
+                    hanging.append({'pid': pid, 'name': p.name()})
                     report_lines.append(self.lang.get('hang_scan_item', name=p.name(), pid=pid))
                 except psutil.NoSuchProcess:
+                    hanging.append({'pid': pid, 'name': None})
                     report_lines.append(self.lang.get('hang_scan_item_closed', pid=pid))
             report_lines.append(self.lang.get('hang_scan_footer'))
-            return "\n".join(report_lines)
+            return ToolResult({'hanging': hanging}, "\n".join(report_lines))
         except Exception as e:
             err_msg = self.lang.get('hang_scan_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
+    @verbatim
     def jalankan_perintah(self, perintah: str):
         print(f"{COLOR_INFO}{self.lang.get('cmd_executing', cmd=perintah)}")
         full_output = []
         try:
             process = subprocess.Popen(perintah, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8', errors='replace', cwd=os.getcwd())
+            token = current_token()
+            if token is not None:
+                token.register(process)
             
             for line in iter(process.stdout.readline, ''):
                 print(line, end='')
@@ -726,25 +935,44 @@ IKUTI ATURAN INI SECARA KETAT:
             return_code = process.wait()
 
             if return_code != 0:
-                return f"\nPerintah selesai dengan error code: {return_code}\n{''.join(full_output)}"
+                return failed(f"Perintah selesai dengan error code: {return_code}\n{''.join(full_output)}")
             
             return ''.join(full_output)
 
         except Exception as e:
             err_msg = self.lang.get('cmd_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def unduh_file(self, url: str, nama_file_simpan: str):
+        path = os.path.abspath(os.path.expanduser(nama_file_simpan))
+        token = current_token()
+        partial = None
         try:
-            path = os.path.abspath(os.path.expanduser(nama_file_simpan))
-            urllib.request.urlretrieve(url, path)
+            with urllib.request.urlopen(url, timeout=DOWNLOAD_SOCKET_TIMEOUT) as response, open(path, 'wb') as f:
+                partial = path
+                while True:
+                    if token is not None:
+                        token.check()
+                    chunk = response.read(64 * 1024)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+            partial = None
             return self.lang.get('download_success', path=path)
+        except ToolCancelled:
+            raise
         except Exception as e:
             err_msg = self.lang.get('download_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
-
+            return failed(err_msg)
+        finally:
+            if partial and os.path.exists(partial):
+                os.remove(partial)
+
+    @read_only
+    @verbatim
+    @memoize(watch=lambda file_path: file_path)
     def baca_file(self, file_path: str):
         try:
             path = os.path.abspath(os.path.expanduser(file_path))
@@ -754,25 +982,35 @@ IKUTI ATURAN INI SECARA KETAT:
         except FileNotFoundError:
             err_msg = self.lang.get('read_fail_not_found', path=file_path)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         except Exception as e:
             err_msg = self.lang.get('read_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
+
+    @read_only
+    @unpaged
+    @verbatim
+    def halaman_berikutnya(self, token: str):
+        return self.tool_scheduler.pager.next_page(token)
+
+    @verbatim
+    def jalankan_rencana(self, rencana: str):
+        return self.plan_executor.run(rencana)
 
     def tulis_file(self, file_path: str, konten: str):
         path = os.path.abspath(os.path.expanduser(file_path))
         action = self.lang.get('write_confirm_overwrite') if os.path.exists(path) else self.lang.get('write_confirm_create')
-        konfirmasi = input(self.lang.get('write_confirm_prompt', action=action, path=path)).lower()
+        konfirmasi = traced_input(self.lang.get('write_confirm_prompt', action=action, path=path)).lower()
         if konfirmasi != 'y':
-            return self.lang.get('write_cancelled')
+            return failed(self.lang.get('write_cancelled'))
         try:
             with open(path, 'w', encoding='utf-8') as f: f.write(konten)
             return self.lang.get('write_success', path=path)
         except Exception as e:
             err_msg = self.lang.get('write_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def buat_folder(self, path_folder: str):
         try:
@@ -782,7 +1020,7 @@ IKUTI ATURAN INI SECARA KETAT:
         except Exception as e:
             err_msg = self.lang.get('mkdir_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def ambil_screenshot(self, nama_file_simpan: str = "screenshot.png"):
         try:
@@ -793,7 +1031,7 @@ IKUTI ATURAN INI SECARA KETAT:
         except Exception as e:
             err_msg = self.lang.get('screenshot_fail', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
     def pecah_file(self, file_sumber: str, folder_tujuan: str):
         def simpen_file_helper(full_path, content_lines, base_folder):
@@ -811,13 +1049,13 @@ IKUTI ATURAN INI SECARA KETAT:
         if not os.path.isfile(source_file):
             err_msg = self.lang.get('split_source_not_found', path=source_file)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         try:
             with open(source_file, 'r', encoding='utf-8') as f: lines = f.readlines()
         except Exception as e:
             err_msg = self.lang.get('split_read_fail', path=source_file, e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         target_path = None
         buffer = []
         total = 0
@@ -857,29 +1095,31 @@ IKUTI ATURAN INI SECARA KETAT:
             return plans
         except (subprocess.CalledProcessError, FileNotFoundError): return []
 
+    @read_only
+    @memoize(ttl=60)
     def info_powerplan(self):
         plans = self._get_power_plans()
         if not plans:
             msg = self.lang.get('powerplan_fail_fetch')
             print(f"{COLOR_ERROR}{msg}")
-            return msg
+            return failed(msg)
         output = [self.lang.get('powerplan_header')]
         for plan in plans:
             prefix = f"{COLOR_SUCCESS} * " if plan['active'] else "   "
             output.append(self.lang.get('powerplan_item', prefix=prefix, name=plan['name'], guid=plan['guid']))
         final_report = "\n".join(output)
-        return final_report
+        return ToolResult({'plans': [{'name': plan['name'], 'active': plan['active']} for plan in plans]}, final_report)
 
     def ganti_powerplan(self, nama_plan: str):
         if not is_admin():
             msg = self.lang.get('powerplan_change_needs_admin')
             print(f"{COLOR_ERROR}{msg}")
-            return msg
+            return failed(msg)
         plans = self._get_power_plans()
         if not plans:
             msg = self.lang.get('powerplan_fail_fetch')
             print(f"{COLOR_ERROR}{msg}")
-            return msg
+            return failed(msg)
         found_plan = None
         for plan in plans:
             if nama_plan.lower() in plan['name'].lower():
@@ -888,7 +1128,7 @@ IKUTI ATURAN INI SECARA KETAT:
         if not found_plan:
             msg = self.lang.get('powerplan_fail_match', name=nama_plan)
             print(f"{COLOR_ERROR}{msg}")
-            return msg
+            return failed(msg)
         try:
             guid = found_plan['guid']
             subprocess.run(f"powercfg /setactive {guid}", capture_output=True, text=True, shell=True, check=True)
@@ -897,15 +1137,158 @@ IKUTI ATURAN INI SECARA KETAT:
         except subprocess.CalledProcessError as e:
             err_msg = self.lang.get('powerplan_change_fail_cmd', e=e.stderr)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
         except Exception as e:
             err_msg = self.lang.get('powerplan_change_fail_generic', e=e)
             print(f"{COLOR_ERROR}{err_msg}")
-            return err_msg
+            return failed(err_msg)
 
-    def handle_clipboard_translation(self, text):
+    def handle_clipboard_translation(self, text, is_superseded=None):
         translated_text = self.translator.translate(text)
+        if is_superseded and is_superseded():
+            return False
         if translated_text: self.nvda.speak(translated_text)
+        return True
+
+    def _collect_chunk(self, chunk, turn):
+        for call in chunk.calls:
+            index = len(turn['calls'])
+            turn['calls'].append(call)
+            if turn['streamed'] is not None and not turn['barrier'] and self.tool_scheduler.can_start_early(call[0]):
+                turn['early'][index] = self.tool_scheduler.submit(*call)
+            else:
+                turn['barrier'] = True
+        if chunk.text:
+            turn['text'] += chunk.text
+            if turn['streamed'] is not None:
+                if not turn['streamed']:
+                    print(self.lang.get('ai_response', text=''), end='', flush=True)
+                    turn['streamed'] = True
+                print(chunk.text, end='', flush=True)
+
+    def _record_latency(self, ttft, total):
+        stats = self.latency_stats
+        stats['requests'] += 1
+        stats['ttft_last'] = ttft
+        stats['ttft_total'] += ttft
+        stats['total_last'] = total
+
+    def _note_local_command(self, command_input, tool_name, tool_args, result):
+        if self.startup.is_done('ai_session') and not self.ai_model:
+            return
+        summary = self.tool_scheduler.text_for_model(tool_name, result)
+        if len(summary) > 400:
+            summary = summary[:400] + "..."
+        self.pending_notices.append(f"System Notification: The user ran '{command_input}' locally (tool {tool_name}, args {tool_args}). Result: {summary}")
+
+    def _compact_history(self):
+        if self.pending_tool_results:
+            return
+        compacted = self.history_manager.compact(self.chat_session.history)
+        if compacted is not None:
+            self.chat_session = self.ai_model.start_chat(history=compacted)
+
+    def _send_message(self, content=None, tool_results=None):
+        stream = self.config.get('stream_responses', True)
+        turn = {'calls': [], 'early': {}, 'text': '', 'streamed': False if stream else None, 'barrier': False}
+        started = time.perf_counter()
+        payload = tool_results if tool_results is not None else content
+        tools = self.active_tools
+        self.tool_selector.charge(tools or self.tools)
+        if self.current_command is not None:
+            self.current_command['round_trips'] += 1
+        with tracer.span('model.send', kind='tool_results' if tool_results is not None else 'message', bytes_out=len(str(payload)), tools=len(tools or self.tools)) as span:
+            if tool_results is not None:
+                chunks = self.chat_session.send_tool_results(tool_results, stream=stream, tools=tools)
+            else:
+                chunks = self.chat_session.send(content, stream=stream, tools=tools)
+            ttft = None
+            try:
+                for chunk in chunks:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    self._collect_chunk(chunk, turn)
+            finally:
+                if turn['streamed']:
+                    print()
+            span['bytes_in'] = len(turn['text']) + len(str(turn['calls']))
+            span['calls'] = len(turn['calls'])
+            span['ttft_ms'] = (ttft or 0.0) * 1000
+        turn['feedback'] = self.chat_session.last_feedback
+        self._record_latency(ttft or 0.0, time.perf_counter() - started)
+        return turn
+
+    def handle_command(self, command_input):
+        try:
+            self.current_command = None
+            with tracer.span('command', bytes_out=len(command_input)) as span:
+                self._handle_command(command_input)
+                if self.current_command:
+                    span.update(self.current_command)
+        finally:
+            tracer.flush()
+
+    def _handle_command(self, command_input):
+        if self.config.get('local_router', True):
+            routed = self.command_router.route(command_input)
+            if routed:
+                self._note_local_command(command_input, *routed)
+                return
+        if not self.startup.is_done('ai_session'):
+            print(f"{COLOR_INFO}{self.lang.get('ai_still_starting')}")
+        if not self.ai_model: 
+            print(self.lang.get('ai_not_active'))
+            return
+        
+        print(f"{COLOR_INFO}{self.lang.get('thinking')}")
+        self.current_command = {'mode': 'direct', 'round_trips': 0}
+        try:
+            if self.pending_tool_results:
+                print(self.lang.get('ai_resuming_tool_results', count=len(self.pending_tool_results)))
+                self._run_turn(self._send_message(tool_results=self.pending_tool_results))
+            if self.config.get('tool_selection', True):
+                selected, _, fallback = self.tool_selector.select(command_input)
+                self.active_tools = None if fallback else selected
+            notices, self.pending_notices = self.pending_notices, []
+            try:
+                turn = self._send_message(notices + [command_input])
+            except ModelRequestError:
+                self.pending_notices = notices + self.pending_notices
+                raise
+            self._run_turn(turn)
+        except ModelRequestError as e:
+            print(self.lang.get('ai_request_failed', attempts=e.attempts, e=e))
+            if self.pending_tool_results:
+                print(self.lang.get('ai_tool_results_pending', count=len(self.pending_tool_results)))
+            return
+        stats = self.round_trip_stats[self.current_command['mode']]
+        stats['commands'] += 1
+        stats['round_trips'] += self.current_command['round_trips']
+        self._compact_history()
+
+    def _run_turn(self, turn):
+        self.pending_tool_results = None
+        while turn['calls']:
+            self.tool_selector.note_calls(turn['calls'])
+            if any(tool_name == 'jalankan_rencana' for tool_name, _ in turn['calls']):
+                self.current_command['mode'] = 'plan'
+            elif self.current_command['mode'] == 'direct':
+                self.current_command['mode'] = 'loop'
+            results = self.tool_scheduler.run(turn['calls'], turn['early'])
+            self.pending_tool_results = [(tool_name, tool_result) for (tool_name, _), tool_result in zip(turn['calls'], results)]
+            turn = self._send_message(tool_results=self.pending_tool_results)
+            self.pending_tool_results = None
+
+        final_text_cleaned = turn['text'].strip()
+        if final_text_cleaned:
+            if not turn['streamed']:
+                print(self.lang.get('ai_response', text=final_text_cleaned))
+            if any(marker in final_text_cleaned for marker in ["--- ISI DARI", "--- HASIL PERINTAH", "Oke, sekarang gue ada di:"]):
+                self.nvda.speak(final_text_cleaned)
+        elif turn['feedback']: 
+            print(self.lang.get('ai_response_blocked', feedback=turn['feedback']))
+        else: 
+            print(self.lang.get('ai_response_blocked_no_reason'))
 
     def run(self):
         self.clipboard_monitor.start()
@@ -914,65 +1297,25 @@ IKUTI ATURAN INI SECARA KETAT:
         print(self.lang.get('shell_privilege_status', status=admin_status))
         if self.session_restored: print(self.lang.get('shell_session_resumed'))
         
-        if not all([psutil, ImageGrab]): 
+        if not all(module.available() for module in (psutil, ImageGrab)): 
             print(self.lang.get('shell_libs_warning'))
-        if not self.ai_model: 
-            print(self.lang.get('shell_ai_fail'))
+        if self.startup.is_done('ai_session'):
+            self._after_ai_ready()
+        else:
+            threading.Thread(target=self._after_ai_ready, daemon=True).start()
+        self.startup.mark('repl')
         
         while True:
             try:
                 cwd = os.getcwd()
                 prompt_display = self.lang.get('prompt', blue_color=Fore.BLUE, cwd=cwd)
-                command_input = input(prompt_display).strip()
+                self.idle_event.set()
+                try:
+                    command_input = input(prompt_display).strip()
+                finally:
+                    self.idle_event.clear()
                 if not command_input: continue
-                if not self.ai_model: 
-                    print(self.lang.get('ai_not_active'))
-                    continue
-                
-                print(f"{COLOR_INFO}{self.lang.get('thinking')}")
-                response = self.chat_session.send_message(command_input)
-                
-                while response.candidates and response.candidates[0].content.parts and response.candidates[0].content.parts[0].function_call:
-                    function_calls = response.candidates[0].content.parts
-                    tool_results = []
-
-                    for call in function_calls:
-                        tool_name = call.function_call.name
-                        tool_args = dict(call.function_call.args)
-                        
-                        if hasattr(self, tool_name):
-                            tool_function = getattr(self, tool_name)
-                            tool_result = tool_function(**tool_args)
-                            
-                            tool_results.append(glm.Part(
-                                function_response=glm.FunctionResponse(
-                                    name=tool_name,
-                                    response={'result': tool_result}
-                                ))
-                            )
-                        else:
-                            print(self.lang.get('tool_not_found', name=tool_name))
-                            tool_results.append(glm.Part(
-                                function_response=glm.FunctionResponse(
-                                    name=tool_name,
-                                    response={'result': f"Error: Function {tool_name} not found."}
-                                ))
-                            )
-                    
-                    response = self.chat_session.send_message(tool_results)
-
-                if response.candidates and response.candidates[0].content.parts:
-                    final_text = response.text
-                    if final_text:
-                        final_text_cleaned = final_text.strip()
-                        print(self.lang.get('ai_response', text=final_text_cleaned))
-                        if any(marker in final_text_cleaned for marker in ["--- ISI DARI", "--- HASIL PERINTAH", "Oke, sekarang gue ada di:"]):
-                            self.nvda.speak(final_text_cleaned)
-                else: 
-                    try: 
-                        print(self.lang.get('ai_response_blocked', feedback=response.prompt_feedback))
-                    except Exception: 
-                        print(self.lang.get('ai_response_blocked_no_reason'))
+                self.handle_command(command_input)
 
             except (KeyboardInterrupt, EOFError): 
                 self.exit()
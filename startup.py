@@ -0,0 +1,64 @@
+import time
+import threading
+
+class StartupOrchestrator:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.tasks = {}
+        self.milestones = {}
+        self._lock = threading.Lock()
+
+    def has(self, name):
+        return name in self.tasks
+
+    def add(self, name, func, deps=()):
+        missing = [dep for dep in deps if dep not in self.tasks]
+        if missing:
+            raise KeyError(f"Startup task '{name}' depends on unknown task(s): {', '.join(missing)}")
+        task = {'name': name, 'func': func, 'deps': tuple(deps), 'event': threading.Event(), 'result': None, 'error': None, 'start': None, 'end': None}
+        with self._lock:
+            self.tasks[name] = task
+        threading.Thread(target=self._run, args=(task,), name=f"startup-{name}", daemon=True).start()
+        return task
+
+    def _run(self, task):
+        for dep in task['deps']:
+            self.tasks[dep]['event'].wait()
+        task['start'] = time.perf_counter()
+        try:
+            task['result'] = task['func']()
+        except Exception as e:
+            task['error'] = e
+        finally:
+            task['end'] = time.perf_counter()
+            task['event'].set()
+
+    def is_done(self, name):
+        return self.tasks[name]['event'].is_set()
+
+    def result(self, name, timeout=None):
+        task = self.tasks[name]
+        if not task['event'].wait(timeout):
+            raise TimeoutError(f"Startup task '{name}' is still running")
+        if task['error'] is not None:
+            raise task['error']
+        return task['result']
+
+    def mark(self, label):
+        self.milestones.setdefault(label, time.perf_counter() - self.started)
+
+    def elapsed(self, name):
+        task = self.tasks.get(name)
+        if not task or task['end'] is None:
+            return None
+        return task['end'] - self.started
+
+    def timings(self):
+        rows = []
+        for task in list(self.tasks.values()):
+            if task['start'] is None:
+                rows.append((task['name'], None, None, task['deps'], task['error']))
+                continue
+            end = task['end'] if task['end'] is not None else time.perf_counter()
+            rows.append((task['name'], task['start'] - self.started, end - task['start'], task['deps'], task['error']))
+        return sorted(rows, key=lambda row: (row[1] is None, row[1] or 0))
@@ -0,0 +1,41 @@
+import json
+import threading
+
+from cache_store import TranslationCache
+
+LEGACY = {
+    "where is my file": "Di mana file saya yang tadi saya simpan di folder dokumen kemarin sore?",
+    "open the browser": "Tolong bukakan peramban web untuk saya sekarang juga, terima kasih banyak.",
+    "ok": "Oke",
+    "the download is done": "Der Download ist abgeschlossen und die Datei wurde im Ordner gespeichert.",
+    "close the window": "Bitte schließen Sie das Fenster, bevor Sie den Computer herunterfahren.",
+}
+
+def _flushers():
+    return {thread for thread in threading.enumerate() if thread.name == 'cache-flusher'}
+
+def test_legacy_import_routes_entries_to_their_language(tmp_path):
+    legacy = tmp_path / 'translation_cache.json'
+    legacy.write_text(json.dumps(LEGACY), encoding='utf-8')
+    cache = TranslationCache(str(tmp_path / 'cache'), 'en')
+    try:
+        assert cache.import_json(str(legacy)) == len(LEGACY)
+        assert cache.shard('id').get("where is my file") == LEGACY["where is my file"]
+        assert cache.shard('de').get("close the window") == LEGACY["close the window"]
+        assert cache.shard('de').get("where is my file") is None
+        assert cache.shard('en').get("where is my file") is None
+        assert "ok" in cache.shard('id') or "ok" in cache.shard('de')
+    finally:
+        cache.close()
+
+def test_one_flusher_for_all_shards(tmp_path):
+    before = _flushers()
+    cache = TranslationCache(str(tmp_path / 'cache'), 'en')
+    try:
+        for lang_code in ('en', 'id', 'de', 'fr'):
+            cache.shard(lang_code).set("halo", lang_code)
+        assert len(_flushers() - before) == 1
+        cache.flush()
+        assert sorted(path.name for path in (tmp_path / 'cache').iterdir()) == ['de.log', 'en.log', 'fr.log', 'id.log']
+    finally:
+        cache.close()
@@ -0,0 +1,54 @@
+import pytest
+
+glm = pytest.importorskip('google.generativeai.protos')
+
+from history_manager import HistoryManager, SUMMARY_HEADER
+
+SYSTEM_PROMPT = "Kamu adalah Smart Shell."
+START_ID = "System Notification: The session is starting. Your conversational responses must be in Indonesian to match the user's interface language, unless the user asks for something in another language."
+START_EN = "System Notification: The session is starting. Your conversational responses must be in English to match the user's interface language, unless the user asks for something in another language."
+SWITCH_EN = "System Notification: User has switched the interface language to English. From now on, your conversational responses must also be in English."
+LOCAL_COMMAND = "System Notification: The user ran 'ls' locally (tool daftar_file, args {}). Result: a.txt"
+
+def _content(role, *texts):
+    return glm.Content(role=role, parts=[glm.Part(text=text) for text in texts])
+
+def _seed(notice):
+    return [_content('user', SYSTEM_PROMPT), _content('model', "Oke, gue siap."), _content('user', notice), _content('model', "OK.")]
+
+def _turns(count, prefix="minta"):
+    history = []
+    for index in range(count):
+        history.append(_content('user', f"{prefix} {index} " + "x" * 400))
+        history.append(_content('model', f"jawab {index} " + "y" * 400))
+    return history
+
+def _texts(history):
+    return [part.text for content in history for part in content.parts]
+
+def test_restored_session_pins_system_prompt_and_latest_notice():
+    history = _seed(START_ID) + _turns(10) + [_content('user', START_EN), _content('model', "OK, I will respond in English.")]
+    compacted = HistoryManager(budget=1000, keep_turns=2).compact(history)
+    assert compacted is not None
+    assert _texts(compacted[:4]) == [SYSTEM_PROMPT, "Oke, gue siap.", START_EN, "OK, I will respond in English."]
+    assert START_ID not in _texts(compacted)
+    assert compacted[4].parts[0].text.startswith(SUMMARY_HEADER)
+
+def test_switch_notice_in_summarized_turn_is_carried_into_summary():
+    history = _seed(START_ID) + [_content('user', SWITCH_EN, "ganti bahasa"), _content('model', "Done.")] + _turns(10)
+    manager = HistoryManager(budget=1000, keep_turns=2)
+    compacted = manager.compact(history)
+    texts = _texts(compacted)
+    assert texts[:2] == [SYSTEM_PROMPT, "Oke, gue siap."]
+    assert START_ID not in texts
+    assert texts.count(SWITCH_EN) == 1
+    assert SWITCH_EN in _texts(compacted[2:3])
+    again = manager.compact(compacted + _turns(6, "lagi"))
+    assert _texts(again)[:2] == [SYSTEM_PROMPT, "Oke, gue siap."]
+    assert _texts(again).count(SWITCH_EN) == 1
+
+def test_summary_line_skips_local_command_notifications():
+    turn = [_content('user', LOCAL_COMMAND, "buka chrome"), _content('model', "Udah dibuka.")]
+    line = HistoryManager()._summary_line(turn)
+    assert line.startswith("- user: buka chrome")
+    assert "ls" not in line
@@ -0,0 +1,58 @@
+import pytest
+from lang_detect import detect_language, is_already_in
+
+INDONESIAN = [
+    "Proses instalasi selesai, aplikasi sudah bisa dipakai sekarang.",
+    "Mohon maaf, layanan sedang dalam perbaikan. Silakan coba lagi nanti.",
+    "Rapat hari ini dibatalkan karena banyak karyawan yang sakit.",
+    "Klik tombol simpan untuk menyimpan perubahan pada dokumen ini.",
+]
+
+ENGLISH = [
+    "The download finished and the file is in your Downloads folder now.",
+    "Please restart your computer to complete the installation.",
+    "The meeting was cancelled because many employees were sick.",
+]
+
+SPANISH = [
+    "La descarga terminó y el archivo ya está en tu carpeta de descargas.",
+    "Por favor, reinicia el equipo para completar la instalación.",
+    "La reunión se canceló porque muchos empleados estaban enfermos.",
+]
+
+@pytest.mark.parametrize("text", INDONESIAN)
+def test_indonesian_matches_target(text):
+    assert is_already_in(text, 'id')
+    assert not is_already_in(text, 'en')
+
+@pytest.mark.parametrize("text", ENGLISH)
+def test_english_detected(text):
+    assert detect_language(text)[0] == 'en'
+    assert is_already_in(text, 'en')
+    assert not is_already_in(text, 'id')
+
+@pytest.mark.parametrize("text", SPANISH)
+def test_spanish_detected(text):
+    assert detect_language(text)[0] == 'es'
+    assert not is_already_in(text, 'pt')
+
+def test_chinese_variants():
+    assert detect_language("文件已经下载到你的文件夹里了，请打开看看。")[0] == 'zh-cn'
+    assert detect_language("檔案已經下載到你的資料夾裡了，請打開看看。")[0] == 'zh-tw'
+    assert is_already_in("文件已经下载到你的文件夹里了，请打开看看。", 'zh-CN')
+    assert not is_already_in("文件已经下载到你的文件夹里了，请打开看看。", 'zh-tw')
+
+def test_japanese_is_not_chinese():
+    assert detect_language("ファイルはダウンロードフォルダに保存されました。")[0] == 'ja'
+
+def test_malay_is_compatible_with_indonesian():
+    text = "Mesyuarat hari ini dibatalkan kerana ramai pekerja yang sakit."
+    assert is_already_in(text, 'ms')
+    assert is_already_in(text, 'id')
+
+def test_unprofiled_language_is_unknown():
+    assert not is_already_in("Rapat dina iki dibatalke amarga akeh karyawan sing lara.", 'id')
+    assert not is_already_in("Kinansela ang pulong dahil maraming empleyado ang may sakit.", 'vi')
+
+def test_short_text_is_unknown():
+    assert detect_language("ok sip")[0] is None
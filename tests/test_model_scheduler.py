@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from model_backend import ModelBackend, ChatHandle, ModelChunk
+from model_scheduler import ScheduledBackend, TokenBucket, ModelRequestError
+
+class _StubChat(ChatHandle):
+    def __init__(self, backend, history):
+        self.backend = backend
+        self._history = list(history)
+
+    @property
+    def history(self):
+        return self._history
+
+    def send(self, messages, stream=True, timeout=None, tools=None):
+        self._history.append(('user', list(messages)))
+        return self._reply()
+
+    def send_tool_results(self, results, stream=True, timeout=None, tools=None):
+        self._history.append(('tool', list(results)))
+        return self._reply()
+
+    def _reply(self):
+        with self.backend.lock:
+            self.backend.calls += 1
+            failure = self.backend.failures.pop(0) if self.backend.failures else None
+        if failure is not None:
+            raise failure
+        time.sleep(self.backend.delay)
+        self._history.append(('model', self.backend.answer))
+        yield ModelChunk(self.backend.answer, [])
+
+class _StubBackend(ModelBackend):
+    def __init__(self, answer, delay=0.0, failures=None):
+        self.model_name = f"stub:{answer}"
+        self.answer = answer
+        self.delay = delay
+        self.failures = list(failures or [])
+        self.calls = 0
+        self.chats = []
+        self.lock = threading.Lock()
+
+    def start_chat(self, history):
+        chat = _StubChat(self, history)
+        self.chats.append(chat)
+        return chat
+
+def _scheduled(primary, fallback=None, **kwargs):
+    options = {'limiter': TokenBucket(0), 'max_retries': 3, 'backoff_base': 0.01, 'backoff_max': 0.02, 'deadline': 5, 'hedge_after': 0}
+    options.update(kwargs)
+    return ScheduledBackend(primary, fallback, **options)
+
+def _text(chunks):
+    return "".join(chunk.text for chunk in chunks)
+
+def test_retries_retryable_error_then_succeeds():
+    primary = _StubBackend('ok', failures=[ConnectionError('reset'), ConnectionError('reset')])
+    backend = _scheduled(primary)
+    chat = backend.start_chat([])
+    assert _text(chat.send(['halo'])) == 'ok'
+    assert primary.calls == 3
+    assert backend.stats['retries'] == 2
+    assert backend.stats['failures'] == 0
+
+def test_non_retryable_error_fails_fast():
+    primary = _StubBackend('ok', failures=[ValueError('bad request')])
+    backend = _scheduled(primary)
+    with pytest.raises(ModelRequestError):
+        _text(backend.start_chat([]).send(['halo']))
+    assert primary.calls == 1
+    assert backend.stats['failures'] == 1
+
+def test_hedge_fires_and_fallback_wins():
+    primary = _StubBackend('slow', delay=2.0)
+    fallback = _StubBackend('fast')
+    backend = _scheduled(primary, fallback, hedge_after=0.1)
+    chat = backend.start_chat([('user', ['seed'])])
+    assert _text(chat.send(['halo'])) == 'fast'
+    assert backend.stats['hedges'] == 1
+    assert backend.stats['hedge_wins'] == 1
+    assert chat.history == [('user', ['seed']), ('user', ['halo']), ('model', 'fast')]
+
+def test_hedge_does_not_duplicate_pending_user_turn():
+    primary = _StubBackend('slow', delay=2.0)
+    fallback = _StubBackend('fast')
+    backend = _scheduled(primary, fallback, hedge_after=0.1)
+    chat = backend.start_chat([('user', ['seed']), ('model', 'hai')])
+    _text(chat.send(['halo']))
+    turns = [turn for turn in fallback.chats[0].history if turn == ('user', ['halo'])]
+    assert len(turns) == 1
+
+def test_hedge_not_fired_when_primary_is_fast():
+    primary = _StubBackend('quick')
+    fallback = _StubBackend('fast')
+    backend = _scheduled(primary, fallback, hedge_after=1.0)
+    assert _text(backend.start_chat([]).send(['halo'])) == 'quick'
+    assert backend.stats['hedges'] == 0
+    assert fallback.calls == 0
+
+def test_deadline_expiry_raises():
+    primary = _StubBackend('slow', delay=3.0)
+    fallback = _StubBackend('slower', delay=3.0)
+    backend = _scheduled(primary, fallback, hedge_after=0.1, deadline=0.5)
+    started = time.monotonic()
+    with pytest.raises(ModelRequestError):
+        _text(backend.start_chat([]).send(['halo']))
+    assert time.monotonic() - started < 2.0
+    assert backend.stats['failures'] == 1
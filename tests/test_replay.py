@@ -0,0 +1,29 @@
+import builtins
+
+import pytest
+
+import language
+from benchmarks import bench_replay
+
+@pytest.fixture
+def lang(tmp_path, monkeypatch):
+    monkeypatch.setattr(language, 'SCRIPT_DIR', str(tmp_path))
+    monkeypatch.setattr(builtins, 'input', lambda prompt='': 'n')
+    workdir = tmp_path / 'work'
+    workdir.mkdir()
+    (workdir / 'notes.txt').write_text('beli kopi', encoding='utf-8')
+    monkeypatch.chdir(workdir)
+    return language.LanguageManager(None, 'id')
+
+def test_sample_recording_replays_completely(lang):
+    shell, timings = bench_replay.replay_once(lang, bench_replay.replay_config(bench_replay.SAMPLE_RECORDING))
+    replay = getattr(shell.ai_model, 'primary', shell.ai_model)
+    assert len(timings) == len(replay.user_messages()) == 4
+    assert replay.stats == {'replayed': len(replay.records), 'skipped': 0}
+    assert shell.tool_scheduler.stats['calls'] == 3
+
+def test_bench_replay_main_runs_on_sample(lang, capsys):
+    bench_replay.main(rounds=1)
+    out = capsys.readouterr().out
+    assert 'replay_session.jsonl' in out
+    assert '0 dilewati' in out
@@ -0,0 +1,15 @@
+import os
+import statistics
+
+from benchmarks.bench_startup import cold_import
+
+BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', 400))
+
+def test_cold_import_within_budget():
+    samples = [cold_import() for _ in range(3)]
+    median_ms = statistics.median(sample['seconds'] for sample in samples) * 1000
+    assert median_ms <= BUDGET_MS, f"cold import shell.py took {median_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)"
+
+def test_no_heavy_module_imported_eagerly():
+    eager = cold_import()['eager']
+    assert not eager, f"heavy modules imported at startup: {', '.join(eager)}"
@@ -0,0 +1,28 @@
+from tool_cache import ToolResultCache, memoize
+from tool_result import failed
+
+def _policy(path):
+    return memoize(watch=lambda: path)(lambda: None).memo
+
+def test_stamp_is_taken_before_the_call(tmp_path):
+    target = tmp_path / 'data.txt'
+    target.write_text('lama', encoding='utf-8')
+    cache = ToolResultCache()
+    policy = _policy(str(target))
+    key = cache.key('baca_file', {}, 'id')
+    result, stamp = cache.get(key, policy, {})
+    assert result is None
+    target.write_text('baru banget', encoding='utf-8')
+    cache.put(key, 'lama', stamp)
+    assert cache.get(key, policy, {})[0] is None
+    assert cache.stats['stale'] == 1
+
+def test_failures_are_not_cached(tmp_path):
+    cache = ToolResultCache()
+    policy = memoize(ttl=300)(lambda: None).memo
+    key = cache.key('cari_aplikasi', {'nama_aplikasi': 'vlc'}, 'id')
+    _, stamp = cache.get(key, policy, {})
+    cache.put(key, failed('winget error'), stamp)
+    assert cache.get(key, policy, {})[0] is None
+    cache.put(key, 'VLC media player', stamp)
+    assert cache.get(key, policy, {})[0] == 'VLC media player'
@@ -0,0 +1,30 @@
+import pytest
+
+from tool_selector import ToolSelector
+
+def _tool(name):
+    def tool():
+        pass
+    tool.__name__ = name
+    return tool
+
+@pytest.fixture
+def selector():
+    return ToolSelector([_tool(name) for name in ("daftar_file", "buka_app", "info_sistem", "jalankan_perintah")])
+
+def _matched(selector, text):
+    return {category for category, score in selector.score(text).items() if score}
+
+@pytest.mark.parametrize("text", ["suka osx dong", "apple pie", "lagi running marathon"])
+def test_keywords_do_not_prefix_match(selector, text):
+    assert _matched(selector, text) == set()
+
+@pytest.mark.parametrize("text, category", [
+    ("cek os gue", 'system'),
+    ("daftar apps yang ada", 'apps'),
+    ("filenya di mana", 'files'),
+    ("bukain chrome", 'apps'),
+    ("run script ini", 'other'),
+])
+def test_keywords_and_listed_inflections_match(selector, text, category):
+    assert category in _matched(selector, text)
@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import utils
+from config import TRANSLATE_BATCH_CHARS
+from http_client import HttpClient
+
+class _StubLang:
+    current_lang_code = 'en'
+
+    def get(self, key, **kwargs):
+        return key
+
+class _TranslateHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        text = query.get('q', [''])[0]
+        with self.server.lock:
+            self.server.requests.append({'path': self.path, 'q': text, 'port': self.client_address[1]})
+        time.sleep(self.server.delay)
+        body = json.dumps([[[text.upper(), text, None, None]]]).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _TranslateHandler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    httpd.delay = 0
+    httpd.lock = threading.Lock()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def translator(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(utils, 'CACHE_FILENAME', str(tmp_path / 'translation_cache.json'))
+    url = f"http://127.0.0.1:{server.server_address[1]}/translate_a/single"
+    translator = utils.Translator(_StubLang(), {'translate_api_url': url, 'language_detection': False})
+    yield translator
+    translator.http.close()
+
+def test_segment_cache_reuse(server, translator):
+    assert translator.translate("Hello world. Good morning.") == "HELLO WORLD. GOOD MORNING."
+    assert len(server.requests) == 1
+    assert translator.translate("Good morning. See you.") == "GOOD MORNING. SEE YOU."
+    assert [request['q'] for request in server.requests[1:]] == ["See you."]
+    assert translator.session_stats['cache'] == 1
+
+def test_long_segment_is_split_under_url_limit(server, translator):
+    text = "Intro line.\n" + ", ".join(f"item number {i} with a fairly long description" for i in range(200)) + "\n" + "x" * 5000
+    assert translator.translate(text) == text.upper()
+    assert len(server.requests) > 2
+    for request in server.requests:
+        assert len(urllib.parse.quote(request['q'])) <= TRANSLATE_BATCH_CHARS
+
+def test_connection_reuse(server):
+    client = HttpClient(f"http://127.0.0.1:{server.server_address[1]}")
+    for i in range(5):
+        client.get_json('/translate_a/single', params={'q': f"text {i}"})
+    client.close()
+    assert client.stats['connections'] == 1
+    assert client.stats['reused'] == 4
+    assert len({request['port'] for request in server.requests}) == 1
+
+def test_single_flight_coalesces_identical_requests(server):
+    server.delay = 0.3
+    client = HttpClient(f"http://127.0.0.1:{server.server_address[1]}")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get_json('/translate_a/single', params={'q': 'same'}))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client.close()
+    assert len(server.requests) == 1
+    assert client.stats['coalesced'] == 4
+    assert all(result == results[0] for result in results)
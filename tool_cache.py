@@ -0,0 +1,67 @@
+import os
+import json
+import time
+import threading
+from config import TOOL_CACHE_MAX_AGE, TOOL_CACHE_MAX_ENTRIES
+from tool_result import is_failure
+
+def memoize(ttl=TOOL_CACHE_MAX_AGE, watch=None):
+    def decorate(func):
+        func.memo = {'ttl': ttl, 'watch': watch}
+        return func
+    return decorate
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+class ToolResultCache:
+    def __init__(self, max_entries=TOOL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = {}
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'invalidations': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _watched_path(policy, tool_args):
+        if policy['watch'] is None:
+            return None
+        return os.path.abspath(os.path.expanduser(policy['watch'](**tool_args)))
+
+    def key(self, tool_name, tool_args, lang_code):
+        return (tool_name, json.dumps(tool_args, sort_keys=True, default=str), os.getcwd(), lang_code)
+
+    def get(self, key, policy, tool_args):
+        path = self._watched_path(policy, tool_args)
+        current = _stamp(path) if path is not None else None
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None, current
+            result, created, stamp = entry
+            expired = policy['ttl'] and time.monotonic() - created > policy['ttl']
+            if expired or current != stamp:
+                del self.entries[key]
+                self.stats['stale'] += 1
+                self.stats['misses'] += 1
+                return None, current
+            self.stats['hits'] += 1
+            return result, current
+
+    def put(self, key, result, stamp):
+        if is_failure(result):
+            return
+        with self._lock:
+            self.entries[key] = (result, time.monotonic(), stamp)
+            while len(self.entries) > self.max_entries:
+                del self.entries[next(iter(self.entries))]
+
+    def invalidate(self):
+        with self._lock:
+            if self.entries:
+                self.entries = {}
+                self.stats['invalidations'] += 1
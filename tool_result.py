@@ -0,0 +1,48 @@
+import re
+import json
+
+ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+RULE = re.compile(r"^[-=*_~#\s]{3,}$")
+BANNER = re.compile(r"^[-=*#]{2,}\s*(.*?)\s*[-=*#]{2,}$")
+PADDING = re.compile(r"(?<=\S)[ \t]{2,}")
+
+class ToolResult:
+    def __init__(self, data, display=None, ok=True):
+        self.data = data
+        self.display = display
+        self.ok = ok
+
+    def __str__(self):
+        return self.display if self.display is not None else to_json(self.data)
+
+def failed(message):
+    return ToolResult(compact_text(str(message)), str(message), ok=False)
+
+def is_failure(result):
+    return isinstance(result, ToolResult) and not result.ok
+
+def to_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str)
+
+def strip_ansi(text):
+    return ANSI.sub('', text)
+
+def compact_text(text):
+    lines = []
+    for line in strip_ansi(text).splitlines():
+        line = line.strip()
+        if not line or RULE.match(line):
+            continue
+        lines.append(PADDING.sub(' ', BANNER.sub(r"\1", line)))
+    return "\n".join(lines)
+
+def for_model(result, verbatim=False):
+    if isinstance(result, ToolResult):
+        return result.data
+    if isinstance(result, str):
+        return strip_ansi(result) if verbatim else compact_text(result)
+    return result
+
+def model_text(result, verbatim=False):
+    data = for_model(result, verbatim)
+    return data if isinstance(data, str) else to_json(data)
@@ -0,0 +1,207 @@
+import time
+import inspect
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from config import TOOL_MAX_WORKERS, RESULT_PAGE_CHARS, TOOL_TRACE_SIZE, TOOL_DEFAULT_TIMEOUT, TOOL_WAIT_GRACE, TOOL_MAX_ABANDONED
+from result_pager import ResultPager
+from tool_cache import ToolResultCache
+from tool_result import for_model, model_text, to_json, failed
+from tracing import tracer
+from tool_watchdog import ToolWatchdog, ToolCancelled, ToolRunner, serve_prompts
+
+def read_only(func):
+    func.read_only = True
+    return func
+
+def is_read_only(func):
+    return getattr(func, 'read_only', False)
+
+def unpaged(func):
+    func.unpaged = True
+    return func
+
+def verbatim(func):
+    func.verbatim = True
+    return func
+
+class ToolScheduler:
+    def __init__(self, shell_instance, max_workers=TOOL_MAX_WORKERS):
+        self.shell = shell_instance
+        self.lang = shell_instance.lang
+        self.stats = {'calls': 0, 'parallel_calls': 0, 'parallel_batches': 0, 'chars_raw': 0, 'chars_model': 0, 'cancel_notices': 0}
+        config = getattr(shell_instance, 'config', {})
+        self.pager = ResultPager(self.lang, config.get('result_page_chars', RESULT_PAGE_CHARS), config.get('result_page_limits'))
+        self.result_cache = ToolResultCache() if config.get('tool_cache', True) else None
+        self.trace = deque(maxlen=TOOL_TRACE_SIZE)
+        self.watchdog = ToolWatchdog(config.get('tool_timeouts'), config.get('tool_default_timeout', TOOL_DEFAULT_TIMEOUT), on_timeout=self._announce_timeout)
+        self.runner = ToolRunner(max_workers, config.get('tool_max_abandoned', TOOL_MAX_ABANDONED))
+        self._abandon_at = None
+
+    def _resolve(self, tool_name):
+        tool_function = getattr(self.shell, tool_name, None) if not tool_name.startswith('_') else None
+        if tool_function is None or not callable(tool_function):
+            return None
+        return tool_function
+
+    def invoke(self, tool_name, tool_args, paged=True, parent=None):
+        if threading.current_thread() is not threading.main_thread():
+            return self._invoke(tool_name, tool_args, paged, parent)
+        self._abandon_at = None
+        return self._wait(self.submit(tool_name, tool_args, paged, parent), tool_name)
+
+    def _invoke(self, tool_name, tool_args, paged=True, parent=None):
+        tool_function = self._resolve(tool_name)
+        if tool_function is None:
+            print(self.lang.get('tool_not_found', name=tool_name))
+            return failed(f"Error: Function {tool_name} not found.")
+        started = time.perf_counter()
+        with tracer.span(f"tool.{tool_name}", parent=parent, bytes_in=len(str(tool_args))) as span:
+            token = self.watchdog.start(tool_name)
+            try:
+                result, cached = self._call(tool_name, tool_function, tool_args)
+            except ToolCancelled:
+                if not token.cancelled:
+                    self.watchdog.interrupt(token)
+                result, cached = None, False
+            finally:
+                self.watchdog.finish(token)
+            if token.cancelled:
+                span['cancelled'] = token.reason
+                if self.result_cache is not None:
+                    self.result_cache.invalidate()
+                result = self._cancelled_result(tool_name, token.reason, time.monotonic() - token.started, result)
+            span['bytes_out'] = len(str(result))
+            span['cached'] = cached
+        self.trace.append({'tool': tool_name, 'args': tool_args, 'ms': (time.perf_counter() - started) * 1000, 'cached': cached})
+        if not paged:
+            return result
+        compact = self.to_model(tool_function, result)
+        if getattr(tool_function, 'unpaged', False):
+            return compact
+        limit = self.pager.limit_for(tool_name)
+        if limit and not isinstance(compact, str) and len(to_json(compact)) > limit:
+            compact = to_json(compact)
+        return self.pager.paginate(tool_name, compact)
+
+    def _cancelled_result(self, tool_name, reason, elapsed, partial=None):
+        if reason == 'timeout':
+            message = self.lang.get('tool_timed_out', name=tool_name, timeout=self.watchdog.timeout_for(tool_name))
+        else:
+            message = self.lang.get('tool_cancelled', name=tool_name, seconds=elapsed)
+        if partial:
+            return failed(f"{message}\n{self.lang.get('tool_partial_result', result=partial)}")
+        return failed(message)
+
+    def _announce_timeout(self, token):
+        self.stats['cancel_notices'] += 1
+        print(self.lang.get('tool_cancel_notice', message=self._cancelled_result(token.tool_name, 'timeout', token.timeout)))
+
+    def _deadline(self, future, fallback):
+        tokens = self.watchdog.tokens_for(future.thread) if future.thread else []
+        if not tokens:
+            return fallback
+        if any(token.paused_since is not None for token in tokens):
+            return None
+        deadlines = [token.deadline for token in tokens if token.deadline is not None]
+        return min(deadlines) + TOOL_WAIT_GRACE if deadlines else None
+
+    def _wait(self, future, tool_name):
+        limit = self.watchdog.timeout_for(tool_name)
+        started = time.monotonic()
+        fallback = started + limit + TOOL_WAIT_GRACE if limit else None
+        while True:
+            deadline = self._deadline(future, fallback)
+            if self._abandon_at is not None:
+                deadline = min(deadline or self._abandon_at, self._abandon_at)
+            try:
+                serve_prompts()
+                return future.result(timeout=0.1)
+            except FutureTimeout:
+                if deadline is not None and time.monotonic() >= deadline:
+                    self.runner.abandon(future)
+                    return self._cancelled_result(tool_name, 'timeout' if self._abandon_at is None else 'interrupt', time.monotonic() - started)
+            except KeyboardInterrupt:
+                self._abandon_at = time.monotonic() + TOOL_WAIT_GRACE
+                self.watchdog.cancel_all('interrupt')
+                self.stats['cancel_notices'] += 1
+                print(self.lang.get('tool_cancel_notice', message=self._cancelled_result(tool_name, 'interrupt', time.monotonic() - started)))
+
+    def to_model(self, tool_function, result):
+        compact = for_model(result, getattr(tool_function, 'verbatim', False))
+        self.stats['chars_raw'] += len(str(result))
+        self.stats['chars_model'] += len(compact) if isinstance(compact, str) else len(to_json(compact))
+        return compact
+
+    def text_for_model(self, tool_name, result):
+        return model_text(result, getattr(self._resolve(tool_name), 'verbatim', False))
+
+    def _call(self, tool_name, tool_function, tool_args):
+        policy = getattr(tool_function, 'memo', None)
+        if self.result_cache is None:
+            return tool_function(**tool_args), False
+        if not is_read_only(tool_function):
+            try:
+                return tool_function(**tool_args), False
+            finally:
+                self.result_cache.invalidate()
+        if policy is None:
+            return tool_function(**tool_args), False
+        try:
+            bound = inspect.signature(tool_function).bind(**tool_args)
+        except TypeError:
+            return tool_function(**tool_args), False
+        bound.apply_defaults()
+        key = self.result_cache.key(tool_name, dict(bound.arguments), self.lang.current_lang_code)
+        result, stamp = self.result_cache.get(key, policy, tool_args)
+        if result is not None:
+            return result, True
+        result = tool_function(**tool_args)
+        self.result_cache.put(key, result, stamp)
+        return result, False
+
+    def can_start_early(self, tool_name):
+        tool_function = self._resolve(tool_name)
+        return tool_function is not None and is_read_only(tool_function)
+
+    def submit(self, tool_name, tool_args, paged=True, parent=None):
+        if self.runner.full():
+            future = Future()
+            future.thread = None
+            future.set_result(failed(self.lang.get('tool_runner_full', count=self.runner.stuck(), name=tool_name)))
+            return future
+        return self.runner.submit(self._invoke, tool_name, tool_args, paged, parent or tracer.current_id())
+
+    def _run_parallel(self, calls, indices, results):
+        if len(indices) == 1:
+            index = indices[0]
+            results[index] = self.invoke(*calls[index])
+            return
+        parent = tracer.current_id()
+        futures = {index: self.submit(*calls[index], True, parent) for index in indices}
+        self.stats['parallel_batches'] += 1
+        self.stats['parallel_calls'] += len(indices)
+        for index, future in futures.items():
+            results[index] = self._wait(future, calls[index][0])
+
+    def run(self, calls, started=None):
+        started = started or {}
+        self._abandon_at = None
+        results = [None] * len(calls)
+        pending = []
+        for index, (tool_name, _) in enumerate(calls):
+            self.stats['calls'] += 1
+            if index in started:
+                results[index] = self._wait(started[index], tool_name)
+                continue
+            tool_function = self._resolve(tool_name)
+            if tool_function is None or is_read_only(tool_function):
+                pending.append(index)
+                continue
+            if pending:
+                self._run_parallel(calls, pending, results)
+                pending = []
+            results[index] = self.invoke(*calls[index])
+        if pending:
+            self._run_parallel(calls, pending, results)
+        return results
@@ -0,0 +1,80 @@
+import re
+import json
+import inspect
+import threading
+from config import HISTORY_CHARS_PER_TOKEN, TOOL_SELECT_MAX_CATEGORIES
+
+TOOL_CATEGORIES = {
+    'system': ["status", "perf", "exit", "restart_program", "elevate_to_admin", "info_sistem", "info_sistem_lengkap", "dapatkan_konteks_os"],
+    'files': ["daftar_file", "direktori_sekarang", "ganti_direktori", "buat_folder", "baca_file", "tulis_file", "copy_file", "move_file", "rename_file", "delete_file", "pecah_file"],
+    'apps': ["buka_app", "daftar_aplikasi", "cari_aplikasi", "install_aplikasi", "buka_website", "unduh_file"],
+    'power': ["info_powerplan", "ganti_powerplan", "shutdown_sistem", "batal_shutdown", "kunci_windows", "daftar_proses", "hentikan_proses", "cari_program_hang"],
+    'other': ["speak", "pause", "resume", "mute", "unmute", "clear_cache", "change_language", "ambil_screenshot", "jalankan_perintah", "halaman_berikutnya", "jalankan_rencana", "run_dism", "set_registry_value"],
+}
+
+CORE_TOOLS = ["dapatkan_konteks_os", "jalankan_perintah", "halaman_berikutnya", "jalankan_rencana", "help"]
+
+CATEGORY_KEYWORDS = {
+    'system': ["status", "perf", "performa", "keluar", "exit", "restart", "admin", "elevate", "sistem", "system", "spek", "spesifikasi", "spec", "specs", "ram", "cpu", "memori", "memory", "disk", "os", "windows versi", "uptime"],
+    'files': ["file", "files", "filenya", "folder", "folders", "foldernya", "direktori", "directory", "dir", "cd", "pindah", "baca", "tulis", "isi", "copy", "salin", "kopi", "move", "rename", "ganti nama", "hapus", "delete", "pecah", "split", "txt", "json", "csv", "log", "logs", "dokumen", "document", "documents", "path", "ls", "cat"],
+    'apps': ["buka", "bukain", "bukakan", "open", "launch", "aplikasi", "aplikasinya", "app", "apps", "program", "programs", "install", "installin", "instal", "instalin", "winget", "website", "web", "situs", "url", "http", "https", "www", "browser", "download", "downloads", "unduh", "google", "youtube"],
+    'power': ["power", "powerplan", "baterai", "battery", "shutdown", "matikan", "matiin", "restart pc", "reboot", "kunci", "lock", "proses", "prosesnya", "process", "processes", "task", "tasks", "kill", "hentikan", "stop", "hang", "not responding", "macet", "lemot", "berat"],
+    'other': ["ngomong", "speak", "ucap", "bacain", "nvda", "mute", "unmute", "diam", "pause", "resume", "jeda", "cache", "bahasa", "language", "translate", "terjemah", "terjemahin", "terjemahkan", "screenshot", "screenshots", "layar", "tangkapan", "perintah", "command", "commands", "cmd", "powershell", "pip", "git", "npm", "jalankan", "jalanin", "run", "dism", "registry", "regedit", "halaman"],
+}
+
+class ToolSelector:
+    def __init__(self, tools, max_categories=TOOL_SELECT_MAX_CATEGORIES):
+        self.tools = list(tools)
+        self.by_name = {func.__name__: func for func in self.tools}
+        self.max_categories = max_categories
+        self.category_of = {name: category for category, names in TOOL_CATEGORIES.items() for name in names}
+        self.core = [name for name in self.by_name if name in CORE_TOOLS or name not in self.category_of]
+        self.patterns = {category: re.compile(r"\b(" + "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True)) + r")\b", re.IGNORECASE) for category, words in CATEGORY_KEYWORDS.items()}
+        self.costs = {name: self.estimate_tokens(func) for name, func in self.by_name.items()}
+        self.full_cost = sum(self.costs.values())
+        self.last_categories = set()
+        self.stats = {'requests': 0, 'fallbacks': 0, 'tokens_full': 0, 'tokens_sent': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_tokens(func):
+        params = {name: getattr(param.annotation, '__name__', 'string') for name, param in inspect.signature(func).parameters.items()}
+        declaration = json.dumps({'name': func.__name__, 'description': inspect.getdoc(func) or '', 'parameters': params})
+        return len(declaration) // HISTORY_CHARS_PER_TOKEN + 1
+
+    def score(self, text):
+        return {category: len(pattern.findall(text)) for category, pattern in self.patterns.items()}
+
+    def note_calls(self, calls):
+        self.last_categories.update(self.category_of[name] for name, _ in calls if name in self.category_of)
+
+    def select(self, text):
+        scores = self.score(text)
+        categories = {category for category, score in scores.items() if score}
+        categories |= self.last_categories
+        self.last_categories = set()
+        fallback = not categories or len(categories) > self.max_categories
+        if fallback:
+            selected = self.tools
+        else:
+            names = set(self.core)
+            for category in categories:
+                names.update(TOOL_CATEGORIES[category])
+            selected = [func for func in self.tools if func.__name__ in names]
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['fallbacks'] += fallback
+        return selected, sorted(categories), fallback
+
+    def charge(self, selected):
+        with self._lock:
+            self.stats['tokens_full'] += self.full_cost
+            self.stats['tokens_sent'] += sum(self.costs[func.__name__] for func in selected)
+
+    def saved_percent(self):
+        full = self.stats['tokens_full']
+        return (full - self.stats['tokens_sent']) / full * 100 if full else 0.0
+
+    def fallback_rate(self):
+        requests = self.stats['requests']
+        return self.stats['fallbacks'] / requests * 100 if requests else 0.0
@@ -0,0 +1,259 @@
+import os
+import time
+import queue
+import threading
+import subprocess
+from contextlib import contextmanager
+from concurrent.futures import Future
+from config import TOOL_DEFAULT_TIMEOUT, TOOL_TIMEOUTS, TOOL_WATCHDOG_INTERVAL, TOOL_MAX_ABANDONED
+from lazy_import import lazy_module
+
+psutil = lazy_module('psutil')
+
+_local = threading.local()
+_prompts = queue.Queue()
+
+class ToolCancelled(Exception):
+    pass
+
+class CancelToken:
+    def __init__(self, tool_name, timeout):
+        self.tool_name = tool_name
+        self.timeout = timeout
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout if timeout else None
+        self.thread = threading.current_thread()
+        self.reason = None
+        self.finished = False
+        self.paused_since = None
+        self.processes = []
+        self.parent = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self.reason is not None
+
+    def check(self):
+        if self.reason:
+            raise ToolCancelled(self.reason)
+
+    def register(self, process):
+        with self._lock:
+            self.processes.append(process)
+            reason = self.reason
+        if reason:
+            _kill(process)
+        return process
+
+    def cancel(self, reason):
+        with self._lock:
+            if self.reason or self.finished:
+                return False
+            self.reason = reason
+            processes = list(self.processes)
+        for process in processes:
+            _kill(process)
+        return True
+
+    def expired(self, now):
+        return self.deadline is not None and self.paused_since is None and now >= self.deadline
+
+    @contextmanager
+    def paused(self):
+        self.paused_since = time.monotonic()
+        try:
+            yield
+        finally:
+            if self.deadline is not None:
+                self.deadline += time.monotonic() - self.paused_since
+            self.paused_since = None
+
+def _kill(process):
+    if process.poll() is not None:
+        return
+    try:
+        for child in psutil.Process(process.pid).children(recursive=True):
+            child.kill()
+    except Exception:
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], capture_output=True)
+    try:
+        process.kill()
+    except Exception:
+        pass
+
+def current_token():
+    return getattr(_local, 'token', None)
+
+@contextmanager
+def pause_watchdog():
+    token = current_token()
+    if token is None:
+        yield
+        return
+    with token.paused():
+        yield
+
+def ask(prompt):
+    if threading.current_thread() is threading.main_thread():
+        return input(prompt)
+    token = current_token()
+    if token is not None:
+        token.check()
+    request = {'prompt': prompt, 'token': token, 'done': threading.Event(), 'cancelled': False}
+    _prompts.put(request)
+    while not request['done'].wait(0.1):
+        if token is not None and token.cancelled:
+            request['cancelled'] = True
+            token.check()
+    if 'error' in request:
+        raise request['error']
+    return request['answer']
+
+def serve_prompts():
+    while True:
+        try:
+            request = _prompts.get_nowait()
+        except queue.Empty:
+            return
+        if request['cancelled'] or (request['token'] is not None and request['token'].cancelled):
+            request['done'].set()
+            continue
+        try:
+            request['answer'] = input(request['prompt'])
+        except KeyboardInterrupt:
+            request['error'] = ToolCancelled('interrupt')
+            raise
+        except EOFError as e:
+            request['error'] = e
+        finally:
+            request['done'].set()
+
+def run_process(args, timeout=None, **kwargs):
+    token = current_token()
+    process = subprocess.Popen(args, **kwargs)
+    if token is not None:
+        token.register(process)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except BaseException:
+        _kill(process)
+        process.communicate()
+        raise
+    if token is not None:
+        token.check()
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+class ToolWatchdog:
+    def __init__(self, timeouts=None, default_timeout=TOOL_DEFAULT_TIMEOUT, interval=TOOL_WATCHDOG_INTERVAL, on_timeout=None):
+        self.timeouts = {**TOOL_TIMEOUTS, **(timeouts or {})}
+        self.default_timeout = default_timeout
+        self.interval = interval
+        self.on_timeout = on_timeout
+        self.active = set()
+        self.stats = {'timeouts': 0, 'interrupted': 0}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def timeout_for(self, tool_name):
+        return self.timeouts.get(tool_name, self.default_timeout)
+
+    def start(self, tool_name):
+        token = CancelToken(tool_name, self.timeout_for(tool_name))
+        token.parent = current_token()
+        _local.token = token
+        with self._lock:
+            self.active.add(token)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch, name="tool-watchdog", daemon=True)
+                self._thread.start()
+        return token
+
+    def finish(self, token):
+        _local.token = token.parent
+        with self._lock:
+            self.active.discard(token)
+        with token._lock:
+            token.finished = True
+
+    def tokens_for(self, thread):
+        with self._lock:
+            return [token for token in self.active if token.thread is thread]
+
+    def interrupt(self, token):
+        if token.cancel('interrupt'):
+            self.stats['interrupted'] += 1
+
+    def cancel_all(self, reason='interrupt'):
+        with self._lock:
+            tokens = list(self.active)
+        for token in tokens:
+            if token.cancel(reason):
+                self.stats['interrupted' if reason == 'interrupt' else 'timeouts'] += 1
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            with self._lock:
+                expired = [token for token in self.active if token.expired(now)]
+            for token in expired:
+                if token.cancel('timeout'):
+                    self.stats['timeouts'] += 1
+                    if self.on_timeout:
+                        self.on_timeout(token)
+
+class ToolRunner:
+    def __init__(self, max_workers, max_abandoned=TOOL_MAX_ABANDONED):
+        self.max_abandoned = max_abandoned
+        self.abandoned = set()
+        self._slots = threading.Semaphore(max_workers)
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def stuck(self):
+        with self._lock:
+            self.abandoned = {thread for thread in self.abandoned if thread.is_alive()}
+            return len(self.abandoned)
+
+    def full(self):
+        return self.stuck() >= self.max_abandoned
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.holds_slot = False
+        with self._lock:
+            self._count += 1
+            name = f"tool-{self._count}"
+        future.thread = threading.Thread(target=self._run, args=(future, fn, args), name=name, daemon=True)
+        future.thread.start()
+        return future
+
+    def abandon(self, future):
+        if future.cancel() or future.thread is None or not future.thread.is_alive():
+            return
+        with self._lock:
+            self.abandoned.add(future.thread)
+            release, future.holds_slot = future.holds_slot, False
+        if release:
+            self._slots.release()
+
+    def _run(self, future, fn, args):
+        self._slots.acquire()
+        with self._lock:
+            future.holds_slot = True
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        finally:
+            with self._lock:
+                release, future.holds_slot = future.holds_slot, False
+            if release:
+                self._slots.release()
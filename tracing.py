@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import atexit
+import threading
+from collections import deque
+from contextlib import contextmanager
+from config import TRACE_FILENAME, TRACE_MAX_BYTES, TRACE_BACKUPS, TRACE_FLUSH_RECORDS, TRACE_SAMPLES_PER_SPAN
+from tool_watchdog import pause_watchdog, ask
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = fraction * (len(ordered) - 1)
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+class Tracer:
+    def __init__(self, path=TRACE_FILENAME, max_bytes=TRACE_MAX_BYTES, backups=TRACE_BACKUPS, enabled=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.enabled = enabled
+        self.aggregates = {}
+        self.span_count = 0
+        self._pending = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._next_id = 0
+        atexit.register(self.flush)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_id(self):
+        stack = self._stack()
+        return stack[-1]['id'] if stack else None
+
+    @contextmanager
+    def span(self, name, parent=None, **attrs):
+        with self._lock:
+            self._next_id += 1
+            span_id = self._next_id
+        stack = self._stack()
+        record = {'id': span_id, 'parent': stack[-1]['id'] if stack else parent, 'name': name, 'attrs': attrs, 'thread': threading.current_thread().name}
+        stack.append(record)
+        started = time.perf_counter()
+        record['ts'] = time.time()
+        try:
+            yield record['attrs']
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['ms'] = (time.perf_counter() - started) * 1000
+            stack.pop()
+            self._finish(record)
+
+    def _finish(self, record):
+        attrs = record['attrs']
+        with self._lock:
+            self.span_count += 1
+            aggregate = self.aggregates.get(record['name'])
+            if aggregate is None:
+                aggregate = self.aggregates[record['name']] = {'count': 0, 'errors': 0, 'durations': deque(maxlen=TRACE_SAMPLES_PER_SPAN), 'bytes_in': 0, 'bytes_out': 0}
+            aggregate['count'] += 1
+            aggregate['durations'].append(record['ms'])
+            aggregate['bytes_in'] += attrs.get('bytes_in', 0) or 0
+            aggregate['bytes_out'] += attrs.get('bytes_out', 0) or 0
+            if 'error' in record:
+                aggregate['errors'] += 1
+            if not self.enabled:
+                return
+            self._pending.append(record)
+            should_flush = len(self._pending) >= TRACE_FLUSH_RECORDS
+        if should_flush:
+            self.flush()
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def flush(self):
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    self._rotate()
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write("".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in pending))
+            except OSError:
+                return 0
+            return len(pending)
+
+    def summary(self):
+        with self._lock:
+            snapshot = {name: dict(aggregate, durations=list(aggregate['durations'])) for name, aggregate in self.aggregates.items()}
+        rows = []
+        for name, aggregate in snapshot.items():
+            durations = aggregate['durations']
+            rows.append({
+                'name': name, 'count': aggregate['count'], 'errors': aggregate['errors'],
+                'p50': percentile(durations, 0.50), 'p95': percentile(durations, 0.95), 'p99': percentile(durations, 0.99),
+                'total': sum(durations), 'bytes_in': aggregate['bytes_in'], 'bytes_out': aggregate['bytes_out'],
+            })
+        return sorted(rows, key=lambda row: -row['total'])
+
+tracer = Tracer()
+
+def traced_input(prompt):
+    with tracer.span('input.confirm'), pause_watchdog():
+        return ask(prompt)
@@ -1,20 +1,27 @@
 import os
 import sys
 import time
-import json
 import threading
+import queue
 import ctypes
-import pyperclip
-import win32file
-import win32clipboard
-import win32con
-import win32gui
-import pywintypes
-import urllib.request
+import re
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Style
-from config import SCRIPT_VERSION, CACHE_FILENAME, COLOR_PROMPT, COLOR_HEADER, COLOR_WARNING, COLOR_SUCCESS, COLOR_ERROR, COLOR_INFO, COLOR_CMD
+from config import SCRIPT_VERSION, CACHE_FILENAME, CACHE_DIR, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL_SECONDS, TRANSLATE_API_URL, TRANSLATE_BATCH_CHARS, TRANSLATE_MAX_WORKERS, CLIPBOARD_QUEUE_SIZE, CLIPBOARD_DEBOUNCE_SECONDS, COLOR_PROMPT, COLOR_HEADER, COLOR_WARNING, COLOR_SUCCESS, COLOR_ERROR, COLOR_INFO, COLOR_CMD
 from language import LanguageManager
+from cache_store import TranslationCache
+from http_client import HttpClient
+from lang_detect import is_already_in
+from lazy_import import lazy_module
+from tracing import tracer
+
+pyperclip = lazy_module('pyperclip')
+win32file = lazy_module('win32file')
+win32clipboard = lazy_module('win32clipboard')
+win32con = lazy_module('win32con')
+win32gui = lazy_module('win32gui')
+pywintypes = lazy_module('pywintypes')
 
 def handle_first_run_consent(lang_manager: LanguageManager):
     config_dir = os.path.join(os.path.expanduser('~'), '.smartshell')
@@ -66,50 +73,168 @@ def is_admin():
         return False
 
 class Translator:
-    def __init__(self, lang_manager: LanguageManager):
+    def __init__(self, lang_manager: LanguageManager, config=None):
         self.lang = lang_manager
+        self.config = config or {}
+        self._target_language = lang_manager.current_lang_code
         self.cache = self._load_cache()
-        self.session_stats = {'api': 0, 'cache': 0}
-        self.target_language = lang_manager.current_lang_code
-    
+        self.session_stats = {'api': 0, 'cache': 0, 'skipped': 0}
+        self._stats_lock = threading.Lock()
+        api_url = urllib.parse.urlsplit(self.config.get('translate_api_url', TRANSLATE_API_URL))
+        self.http = HttpClient(f"{api_url.scheme}://{api_url.netloc}", headers={'User-Agent': 'Mozilla/5.0'})
+        self._api_path = api_url.path
+
+    @property
+    def target_language(self):
+        return self._target_language
+
+    @target_language.setter
+    def target_language(self, lang_code):
+        self._target_language = lang_code
+        self.cache.set_active(lang_code)
+
     def _load_cache(self):
-        if os.path.exists(CACHE_FILENAME):
-            with open(CACHE_FILENAME, 'r', encoding='utf-8') as f:
-                try: return json.load(f)
-                except json.JSONDecodeError: return {}
-        return {}
+        cache = TranslationCache(
+            CACHE_DIR, self._target_language,
+            max_entries=self.config.get('cache_max_entries', CACHE_MAX_ENTRIES),
+            max_bytes=self.config.get('cache_max_bytes', CACHE_MAX_BYTES),
+            ttl=self.config.get('cache_ttl_seconds', CACHE_TTL_SECONDS)
+        )
+        if not os.path.isdir(CACHE_DIR) and os.path.exists(CACHE_FILENAME):
+            cache.import_json(CACHE_FILENAME)
+            cache.flush()
+        return cache
 
     def _save_cache(self):
-        with open(CACHE_FILENAME, 'w', encoding='utf-8') as f:
-            json.dump(self.cache, f, indent=4, ensure_ascii=False)
+        self.cache.flush()
+
+    def export_cache(self, path=CACHE_FILENAME):
+        self.cache.flush()
+        return self.cache.export_json(path)
+
+    _SEGMENT_SPLIT = re.compile(r'(\n\s*\n|\n|(?<=[.!?\u3002\uff01\uff1f])\s+)')
+    _CHUNK_SPLIT = re.compile(r'(?<=[\s,\u3001\uff0c])')
+
+    def _split_long(self, segment):
+        limit = TRANSLATE_BATCH_CHARS - 3
+        if len(urllib.parse.quote(segment)) <= limit:
+            return [segment]
+        pieces, current, current_len = [], "", 0
+        for word in self._CHUNK_SPLIT.split(segment):
+            word_len = len(urllib.parse.quote(word))
+            if current and current_len + word_len > limit:
+                pieces.append(current)
+                current, current_len = "", 0
+            while word_len > limit:
+                step = max(1, limit // 12)
+                pieces.append(word[:step])
+                word = word[step:]
+                word_len = len(urllib.parse.quote(word))
+            current += word
+            current_len += word_len
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def _split_segments(self, text):
+        parts = self._SEGMENT_SPLIT.split(text)
+        segments = []
+        for segment, separator in zip(parts[0::2], parts[1::2] + ['']):
+            pieces = self._split_long(segment)
+            segments.extend((piece, '') for piece in pieces[:-1])
+            segments.append((pieces[-1], separator))
+        return segments
+
+    def _request_translation(self, text):
+        params = {'client': 'gtx', 'sl': 'auto', 'tl': self.target_language, 'dt': 't', 'q': text}
+        with tracer.span('translate.http', bytes_out=len(text), target=self.target_language) as span:
+            data = self.http.get_json(self._api_path, params=params)
+            translated = "".join([item[0] for item in data[0] if item[0]])
+            span['bytes_in'] = len(translated)
+        with self._stats_lock:
+            self.session_stats['api'] += 1
+        return translated
+
+    def _make_batches(self, texts):
+        batches, current, current_len = [], [], 0
+        for text in texts:
+            encoded_len = len(urllib.parse.quote(text)) + 3
+            if current and current_len + encoded_len > TRANSLATE_BATCH_CHARS:
+                batches.append(current)
+                current, current_len = [], 0
+            current.append(text)
+            current_len += encoded_len
+        if current:
+            batches.append(current)
+        return batches
+
+    def _translate_batch(self, batch):
+        if len(batch) == 1:
+            return {batch[0]: self._request_translation(batch[0])}
+        translated = self._request_translation("\n".join(batch))
+        lines = translated.split("\n") if translated is not None else []
+        if len(lines) == len(batch):
+            return dict(zip(batch, lines))
+        return {text: self._request_translation(text) for text in batch}
 
     def translate(self, text, is_manual=False):
-        cache_key = text.strip().lower()
-        if not is_manual and cache_key in self.cache:
-            self.session_stats['cache'] += 1
-            return self.cache[cache_key]
+        if self.config.get('language_detection', True) and is_already_in(text, self.target_language):
+            with self._stats_lock:
+                self.session_stats['skipped'] += 1
+            return text
+
+        segments = self._split_segments(text)
+        translations = {}
+        missing = []
+        for segment, _ in segments:
+            source = segment.strip()
+            if not source or source in translations or source in missing:
+                continue
+            cached = None if is_manual else self.cache.get(source.lower())
+            if cached is not None:
+                with self._stats_lock:
+                    self.session_stats['cache'] += 1
+                translations[source] = cached
+            else:
+                missing.append(source)
+
         try:
-            url_safe_text = urllib.parse.quote(text)
-            url = f"[https://translate.googleapis.com/translate_a/single?client=gtx&sl=auto&tl=](https://translate.googleapis.com/translate_a/single?client=gtx&sl=auto&tl=){self.target_language}&dt=t&q={url_safe_text}"
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req) as response:
-                if response.status == 200:
-                    data = json.loads(response.read())
-                    translated_text = "".join([item[0] for item in data[0] if item[0]])
-                    self.session_stats['api'] += 1
-                    if not is_manual: 
-                        self.cache[cache_key] = translated_text
-                        self._save_cache()
-                    return translated_text
-            return None
+            batches = self._make_batches(missing)
+            if len(batches) == 1:
+                results = [self._translate_batch(batches[0])]
+            elif batches:
+                with ThreadPoolExecutor(max_workers=TRANSLATE_MAX_WORKERS) as pool:
+                    results = list(pool.map(self._translate_batch, batches))
+            else:
+                results = []
         except Exception as e:
             print(self.lang.get('translate_error', e=e))
             return None
 
+        for result in results:
+            for source, translated_text in result.items():
+                if translated_text is None:
+                    return None
+                translations[source] = translated_text
+                if not is_manual:
+                    self.cache.set(source.lower(), translated_text)
+
+        output = []
+        for segment, separator in segments:
+            source = segment.strip()
+            if source:
+                leading = segment[:len(segment) - len(segment.lstrip())]
+                trailing = segment[len(segment.rstrip()):]
+                output.append(f"{leading}{translations[source]}{trailing}")
+            else:
+                output.append(segment)
+            output.append(separator)
+        return "".join(output)
+
     def clear_cache(self):
-        self.cache = {}
-        self.session_stats = {'api': 0, 'cache': 0}
-        self._save_cache()
+        self.cache.clear()
+        with self._stats_lock:
+            self.session_stats = {'api': 0, 'cache': 0, 'skipped': 0}
         return self.lang.get('cache_cleared')
 
 class NVDA_Handler:
@@ -143,14 +268,66 @@ class NVDA_Handler:
                 print(f"\n{COLOR_ERROR}{err_msg}")
                 return err_msg
 
+class Clipboard_Worker(threading.Thread):
+    def __init__(self, shell_instance, max_queue=CLIPBOARD_QUEUE_SIZE, debounce=CLIPBOARD_DEBOUNCE_SECONDS):
+        super().__init__(daemon=True)
+        self.shell = shell_instance
+        self.lang = shell_instance.lang
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.debounce = debounce
+        self.stats = {'enqueued': 0, 'processed': 0, 'dropped': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def submit(self, text):
+        self._count('enqueued')
+        while True:
+            try:
+                self.queue.put_nowait(text)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self._count('dropped')
+                except queue.Empty:
+                    pass
+
+    def depth(self):
+        return self.queue.qsize()
+
+    def is_superseded(self):
+        return not self.queue.empty()
+
+    def run(self):
+        while True:
+            text = self.queue.get()
+            while True:
+                try:
+                    text = self.queue.get(timeout=self.debounce)
+                    self._count('dropped')
+                except queue.Empty:
+                    break
+            try:
+                if not self.shell.handle_clipboard_translation(text, self.is_superseded):
+                    self._count('dropped')
+                    continue
+            except Exception as e:
+                print(self.lang.get('translate_error', e=e))
+            self._count('processed')
+
 class Clipboard_Monitor(threading.Thread):
     def __init__(self, shell_instance):
         super().__init__(daemon=True)
         self.shell = shell_instance
         self.lang = shell_instance.lang
         self.last_clipboard = ""
+        self.worker = Clipboard_Worker(shell_instance)
 
     def run(self):
+        self.worker.start()
         self.ClipboardListenerWindow(self)
 
     class ClipboardListenerWindow:
@@ -172,7 +349,7 @@ class Clipboard_Monitor(threading.Thread):
                     if isinstance(current_clipboard, str) and current_clipboard and current_clipboard != self.parent.last_clipboard:
                         self.parent.last_clipboard = current_clipboard
                         print(self.lang.get('clipboard_detected'))
-                        self.parent.shell.handle_clipboard_translation(current_clipboard)
+                        self.parent.worker.submit(current_clipboard)
                 except pyperclip.PyperclipException:
                     pass
             elif msg == win32con.WM_CHANGECBCHAIN: